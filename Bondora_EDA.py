@@ -14,6 +14,8 @@ warnings.filterwarnings("ignore")
 import matplotlib.pyplot as plt
 from itertools import product
 import seaborn as sns
+import codes
+import outliers
 
 
 # # Bondora Data Preprocessing 
@@ -26,7 +28,9 @@ import seaborn as sns
 # In[3]:
 
 
-credit_risk = pd.read_csv("Bondora_raw.csv",low_memory=False)
+from ingest import read_raw, MISS_COL, EDA_COLS_DEL
+# only the columns that survive the drops below are parsed; later runs hit the columnar cache
+credit_risk = read_raw('Bondora_raw.csv', drop=MISS_COL + EDA_COLS_DEL)
 
 
 # In[4]:
@@ -203,27 +207,14 @@ credit_risk.isnull().sum()/(len(credit_risk))*100
 
 
 # print missing values columns 
-miss_col=['ContractEndDate', 'NrOfDependants', 'EmploymentPosition',
-       'WorkExperience', 'PlannedPrincipalTillDate', 'CurrentDebtDaysPrimary',
-       'DebtOccuredOn', 'CurrentDebtDaysSecondary',
-       'DebtOccuredOnForSecondary',
-       'PlannedPrincipalPostDefault', 'PlannedInterestPostDefault', 'EAD1',
-       'EAD2', 'PrincipalRecovery', 'InterestRecovery', 'RecoveryStage',
-       'EL_V0', 'Rating_V0', 'EL_V1', 'Rating_V1', 'Rating_V2',
-       'ActiveLateCategory', 'CreditScoreEsEquifaxRisk',
-       'CreditScoreFiAsiakasTietoRiskGrade', 'CreditScoreEeMini',
-       'PrincipalWriteOffs', 'InterestAndPenaltyWriteOffs',
-       'PreviousEarlyRepaymentsBefoleLoan', 'GracePeriodStart',
-       'GracePeriodEnd', 'NextPaymentDate', 'ReScheduledOn',
-       'PrincipalDebtServicingCost', 'InterestAndPenaltyDebtServicingCost',
-       'ActiveLateLastPaymentCategory']
+miss_col=MISS_COL
 
 
 # In[10]:
 
 
 # drop missing  values columns )
-credit_risk = credit_risk.drop(miss_col, axis=1)
+credit_risk = credit_risk.drop(miss_col, axis=1, errors='ignore')
 
 
 # In[11]:
@@ -235,7 +226,7 @@ credit_risk.shape
 # In[12]:
 
 
-credit_risk['NrOfScheduledPayments'].head()
+credit_risk.columns
 
 
 # Apart from missing value features there are some features which will have no role in default prediction like 'ReportAsOfEOD', 'LoanId', 'LoanNumber', 'ListedOnUTC', 'DateOfBirth' (**because age is already present**), 'BiddingStartedOn','UserName','NextPaymentNr','NrOfScheduledPayments','IncomeFromPrincipalEmployer', 'IncomeFromPension',
@@ -248,15 +239,7 @@ credit_risk['NrOfScheduledPayments'].head()
 # In[13]:
 
 
-cols_del = ['LastPaymentOn','ReportAsOfEOD', 'LoanId', 'LoanNumber', 'ListedOnUTC', 'DateOfBirth',
-       'BiddingStartedOn','UserName','NextPaymentNr',
-       'NrOfScheduledPayments','IncomeFromPrincipalEmployer', 'IncomeFromPension',
-       'IncomeFromFamilyAllowance', 'IncomeFromSocialWelfare',
-       'IncomeFromLeavePay', 'IncomeFromChildSupport', 'IncomeOther','LoanApplicationStartedDate','ApplicationSignedHour',
-       'ApplicationSignedWeekday','ActiveScheduleFirstPaymentReached', 'PlannedInterestTillDate',
-       'ExpectedLoss', 'LossGivenDefault', 'ExpectedReturn',
-       'ProbabilityOfDefault', 'PrincipalOverdueBySchedule',
-       'StageActiveSince', 'ModelVersion','WorseLateCategory','ExistingLiabilities','RefinanceLiabilities','DebtToIncome', 'FreeCash', 'MonthlyPaymentDay','BidsPortfolioManager','BidsApi', 'BidsManual','LoanDate', 'FirstPaymentDate', 'MaturityDate_Original','MaturityDate_Last','Amount','County','Rating','PrincipalPaymentsMade','InterestAndPenaltyPaymentsMade','PrincipalBalance','InterestAndPenaltyBalance','PreviousRepaymentsBeforeLoan']
+cols_del = EDA_COLS_DEL
 
 
 # In[ ]:
@@ -268,7 +251,7 @@ cols_del = ['LastPaymentOn','ReportAsOfEOD', 'LoanId', 'LoanNumber', 'ListedOnUT
 # In[14]:
 
 
-credit_risk_clean = credit_risk.drop(cols_del,axis=1)
+credit_risk_clean = credit_risk.drop(cols_del,axis=1,errors='ignore')
 
 
 # In[15]:
@@ -445,82 +428,16 @@ fig.show()
 # In[39]:
 
 
-# For MonthlyPayment
-Q1_MonthlyPayment = credit_risk_filter['MonthlyPayment'].quantile(0.25)
-print(Q1_MonthlyPayment)
-Q3_MonthlyPayment=credit_risk_filter['MonthlyPayment'].quantile(0.75)
-print(Q3_MonthlyPayment)
-IQR_MonthlyPayment=Q3_MonthlyPayment-Q1_MonthlyPayment
-print(IQR_MonthlyPayment)
-
-
-# In[40]:
-
-
-ul_MonthlyPayment = Q3_MonthlyPayment+1.5*IQR_MonthlyPayment
-print(ul_MonthlyPayment)
-ll_MonthlyPayment = Q1_MonthlyPayment-1.5*IQR_MonthlyPayment
-print(ll_MonthlyPayment)
+# IQR fences for MonthlyPayment, AmountOfPreviousLoansBeforeLoan and IncomeTotal, computed in one pass
+fences = outliers.iqr_fences(credit_risk_filter, ['MonthlyPayment', 'AmountOfPreviousLoansBeforeLoan', 'IncomeTotal'], k=1.5)
+print(fences)
 
 
 # In[41]:
 
 
-credit_risk_filter=credit_risk_filter.drop(credit_risk_filter[ (credit_risk_filter.MonthlyPayment > ul_MonthlyPayment) | (credit_risk_filter.MonthlyPayment < ll_MonthlyPayment) ].index)
-
-
-# In[42]:
-
-
-# For AmountOfPreviousLoansBeforeLoan
-Q1_AmountOfPreviousLoans = credit_risk_filter['AmountOfPreviousLoansBeforeLoan'].quantile(0.25)
-print(Q1_AmountOfPreviousLoans)
-Q3_AmountOfPreviousLoans=credit_risk_filter['AmountOfPreviousLoansBeforeLoan'].quantile(0.75)
-print(Q3_AmountOfPreviousLoans)
-IQR_AmountOfPreviousLoans=Q3_AmountOfPreviousLoans-Q1_AmountOfPreviousLoans
-print(IQR_AmountOfPreviousLoans)
-
-
-# In[43]:
-
-
-ul_AmountOfPreviousLoans = Q3_AmountOfPreviousLoans+1.5*IQR_AmountOfPreviousLoans
-print(ul_AmountOfPreviousLoans)
-ll_AmountOfPreviousLoans = Q1_AmountOfPreviousLoans-1.5*IQR_AmountOfPreviousLoans
-print(ll_AmountOfPreviousLoans)
-
-
-# In[44]:
-
-
-credit_risk_filter=credit_risk_filter.drop(credit_risk_filter[ (credit_risk_filter.AmountOfPreviousLoansBeforeLoan > ul_AmountOfPreviousLoans) | (credit_risk_filter.AmountOfPreviousLoansBeforeLoan < ll_AmountOfPreviousLoans) ].index)
-
-
-# In[45]:
-
-
-# for IncomeTotal
-Q1_IncomeTotal = credit_risk_filter['IncomeTotal'].quantile(0.25)
-print(Q1_IncomeTotal)
-Q3_IncomeTotal=credit_risk_filter['IncomeTotal'].quantile(0.75)
-print(Q3_IncomeTotal)
-IQR_IncomeTotal=Q3_IncomeTotal-Q1_IncomeTotal
-print(IQR_IncomeTotal)
-
-
-# In[46]:
-
-
-ul_IncomeTotal = Q3_IncomeTotal+1.5*IQR_IncomeTotal
-print(ul_IncomeTotal)
-ll_IncomeTotal = Q1_IncomeTotal-1.5*IQR_IncomeTotal
-print(ll_IncomeTotal)
-
-
-# In[47]:
-
-
-credit_risk_filter=credit_risk_filter.drop(credit_risk_filter[ (credit_risk_filter.IncomeTotal > ul_IncomeTotal) | (credit_risk_filter.IncomeTotal < ll_IncomeTotal) ].index)
+# drop every row outside any of the fences with a single filter
+credit_risk_filter = outliers.iqr_filter(credit_risk_filter, fences)
 
 
 # - First we will delete all the features related to date as it is not a time series analysis so these features will not help in predicting target variable.
@@ -579,24 +496,7 @@ sns.histplot(data=sample,bins=50,x='LiabilitiesTotal')
 # In[54]:
 
 
-def lang_code(x):
-    if(x==1):
-        return 'Estonian'
-    elif x==2: 
-        return 'English'
-    elif x==3:
-        return 'Russian'
-    elif x==4:
-        return 'Finnish'
-    elif x==5:
-        return 'German'
-    elif x==6:
-        return 'Spanish'
-    elif x==9:
-        return 'Slovakian'
-    else:
-        return 'Other'
-credit_risk_filter['LanguageCode']=credit_risk_filter.LanguageCode.apply(lang_code)
+credit_risk_filter['LanguageCode']=codes.LANGUAGE_CODE.decode(credit_risk_filter.LanguageCode)
 credit_risk_filter['LanguageCode'].unique()
 
 
@@ -621,28 +521,7 @@ credit_risk_filter.UseOfLoan.value_counts()
 # In[57]:
 
 
-def UseOfLoan(x):
-    if(x==-1):
-        return 'No Specified purpose'
-    elif x==2: 
-        return 'Home improvement'
-    elif x==0:
-        return 'Loan consolidation'
-    elif x==6:
-        return 'Vehicle'
-    elif x==3:
-        return 'Business'
-    elif x==5:
-        return 'Travel'
-    elif x==8:
-        return 'Health'
-    elif x==4:
-        return 'Education'
-    elif x==1:
-        return 'Real estate'
-    else:
-        return 'Other'
-credit_risk_filter['UseOfLoan']=credit_risk_filter.UseOfLoan.apply(UseOfLoan)
+credit_risk_filter['UseOfLoan']=codes.USE_OF_LOAN.decode(credit_risk_filter.UseOfLoan)
 credit_risk_filter['UseOfLoan'].unique()
 
 
@@ -664,20 +543,7 @@ credit_risk_filter.Education.value_counts()
 # In[60]:
 
 
-def education(x):
-    if(x==1):
-        return 'Primary education'
-    elif x==2: 
-        return 'Basic education'
-    elif x==3:
-        return 'Vocational education'
-    elif x==4:
-        return 'Secondary education'
-    elif x==5:
-        return 'Higher education'
-    else:
-        return 'Not_present'
-credit_risk_filter['Education']=credit_risk_filter.Education.apply(education)
+credit_risk_filter['Education']=codes.EDUCATION.decode(credit_risk_filter.Education)
 credit_risk_filter['Education'].unique()
 
 
@@ -699,20 +565,7 @@ credit_risk_filter.MaritalStatus.value_counts()
 # In[63]:
 
 
-def maritalStatus(x):
-    if(x==1):
-        return 'Married'
-    elif x==2: 
-        return 'Cohabitant'
-    elif x==3:
-        return 'Single'
-    elif x==4:
-        return 'Divorced'
-    elif x==5:
-        return 'Widow'
-    else:
-        return 'Not_specified'
-credit_risk_filter['MaritalStatus']=credit_risk_filter.MaritalStatus.apply(maritalStatus)
+credit_risk_filter['MaritalStatus']=codes.MARITAL_STATUS.decode(credit_risk_filter.MaritalStatus)
 credit_risk_filter['MaritalStatus'].unique()
 
 
@@ -732,22 +585,7 @@ credit_risk_filter.EmploymentStatus.value_counts()
 # In[66]:
 
 
-def employment(x):
-    if(x==1):
-        return 'Unemployed'
-    elif x==2: 
-        return 'Partially employed'
-    elif x==3:
-        return 'Fully employed'
-    elif x==4:
-        return 'Self-employed'
-    elif x==5:
-        return 'Entrepreneur'
-    elif x==6:
-        return 'Retiree'
-    else:
-        return 'other'
-credit_risk_filter['EmploymentStatus']=credit_risk_filter.EmploymentStatus.apply(employment)
+credit_risk_filter['EmploymentStatus']=codes.EMPLOYMENT_STATUS.decode(credit_risk_filter.EmploymentStatus)
 credit_risk_filter['EmploymentStatus'].unique()
 
 
@@ -772,42 +610,7 @@ credit_risk_filter.OccupationArea.value_counts()
 # In[70]:
 
 
-def occupationArea(x):
-    if(x==-1):
-        return 'Not_specified'
-    elif x==1: 
-        return 'Other'
-    elif x==2: 
-        return 'Mining'
-    elif x==3: 
-        return 'Processing'
-    elif x==6:
-        return 'Construction'
-    elif x==7:
-        return 'Retail and wholesale'
-    elif x==8:
-        return 'Transport and warehousing'
-    elif x==9:
-        return 'Hospitality and catering'
-    elif x==10:
-        return 'Info and telecom'
-    elif x==11:
-        return 'Finance and insurance'
-    elif x==13:
-        return 'Research'
-    elif x==14:
-        return 'Administrative'
-    elif x==15:
-        return 'Civil service & military'
-    elif x==16:
-        return 'Education'
-    elif x==17:
-        return 'Healthcare and social help'
-    elif x==19:
-        return 'Agriculture, forestry and fishing'
-    else:
-        return 'Other'
-credit_risk_filter['OccupationArea']=credit_risk_filter.OccupationArea.apply(occupationArea)
+credit_risk_filter['OccupationArea']=codes.OCCUPATION_AREA.decode(credit_risk_filter.OccupationArea)
 credit_risk_filter['OccupationArea'].unique()
 
 
@@ -829,30 +632,7 @@ credit_risk_filter.HomeOwnershipType.value_counts()
 # In[73]:
 
 
-def homeOwnershipType(x):
-    if(x==0):
-        return 'Homeless'
-    elif x==1: 
-        return 'Owner'
-    elif x==2: 
-        return 'Living with parents'
-    elif x==3: 
-        return 'Tenant pre-furnished'
-    elif x==4:
-        return 'Tenant, unfurnished'
-    elif x==5:
-        return 'Council house'
-    elif x==6:
-        return 'Joint tenant'
-    elif x==7:
-        return 'Joint ownership'
-    elif x==8:
-        return 'Mortgage'
-    elif x==9:
-        return 'Owner with encumbrance'
-    else:
-        return 'Other'
-credit_risk_filter['HomeOwnershipType']=credit_risk_filter.HomeOwnershipType.apply(homeOwnershipType)
+credit_risk_filter['HomeOwnershipType']=codes.HOME_OWNERSHIP_TYPE.decode(credit_risk_filter.HomeOwnershipType)
 credit_risk_filter['HomeOwnershipType'].unique()
 
 
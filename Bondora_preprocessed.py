@@ -22,7 +22,9 @@ warnings.filterwarnings("ignore")
 # In[2]:
 
 
-df=pd.read_csv('Bondora_raw.csv',low_memory=False)
+from ingest import read_raw, MISS_COL, PREPROCESSED_COLS_DEL
+# only the columns that survive the drops below are parsed; later runs hit the columnar cache
+df=read_raw('Bondora_raw.csv', drop=MISS_COL + PREPROCESSED_COLS_DEL)
 
 
 # In[3]:
@@ -202,34 +204,21 @@ missing_value_df
 
 
 # print missing values columns 
-miss_col=['ContractEndDate', 'NrOfDependants', 'EmploymentPosition',
-       'WorkExperience', 'PlannedPrincipalTillDate', 'CurrentDebtDaysPrimary',
-       'DebtOccuredOn', 'CurrentDebtDaysSecondary',
-       'DebtOccuredOnForSecondary',
-       'PlannedPrincipalPostDefault', 'PlannedInterestPostDefault', 'EAD1',
-       'EAD2', 'PrincipalRecovery', 'InterestRecovery', 'RecoveryStage',
-       'EL_V0', 'Rating_V0', 'EL_V1', 'Rating_V1', 'Rating_V2',
-       'ActiveLateCategory', 'CreditScoreEsEquifaxRisk',
-       'CreditScoreFiAsiakasTietoRiskGrade', 'CreditScoreEeMini',
-       'PrincipalWriteOffs', 'InterestAndPenaltyWriteOffs',
-       'PreviousEarlyRepaymentsBefoleLoan', 'GracePeriodStart',
-       'GracePeriodEnd', 'NextPaymentDate', 'ReScheduledOn',
-       'PrincipalDebtServicingCost', 'InterestAndPenaltyDebtServicingCost',
-       'ActiveLateLastPaymentCategory']
+miss_col=MISS_COL
 
 
 # In[9]:
 
 
 # drop missing  values columns )
-loan = df.drop(miss_col, axis=1)
+loan = df.drop(miss_col, axis=1, errors='ignore')
 loan.shape
 
 
 # In[10]:
 
 
-loan['NrOfScheduledPayments'].head()
+loan.columns
 
 
 # Apart from missing value features there are some features which will have no role in default prediction like 'ReportAsOfEOD', 'LoanId', 'LoanNumber', 'ListedOnUTC', 'DateOfBirth' (**because age is already present**), 'BiddingStartedOn','UserName','NextPaymentNr','NrOfScheduledPayments','IncomeFromPrincipalEmployer', 'IncomeFromPension',
@@ -242,21 +231,13 @@ loan['NrOfScheduledPayments'].head()
 # In[11]:
 
 
-cols_del = ['ReportAsOfEOD', 'LoanId', 'LoanNumber', 'ListedOnUTC', 'DateOfBirth',
-       'BiddingStartedOn','UserName','NextPaymentNr',
-       'NrOfScheduledPayments','IncomeFromPrincipalEmployer', 'IncomeFromPension',
-       'IncomeFromFamilyAllowance', 'IncomeFromSocialWelfare',
-       'IncomeFromLeavePay', 'IncomeFromChildSupport', 'IncomeOther','LoanApplicationStartedDate','ApplicationSignedHour',
-       'ApplicationSignedWeekday','ActiveScheduleFirstPaymentReached', 'PlannedInterestTillDate',
-       'ExpectedLoss', 'LossGivenDefault', 'ExpectedReturn',
-       'ProbabilityOfDefault', 'PrincipalOverdueBySchedule',
-       'StageActiveSince', 'ModelVersion','WorseLateCategory']
+cols_del = PREPROCESSED_COLS_DEL
 
 
 # In[12]:
 
 
-loan = loan.drop(cols_del,axis=1)
+loan = loan.drop(cols_del,axis=1,errors='ignore')
 
 
 # In[13]:
@@ -573,6 +554,8 @@ loan['HomeOwnershipType'].value_counts()
 
 
 # save the final data
+# (exports that do not fit in memory: `python preprocess.py Bondora_raw.csv Bondora_preprocessed.csv --chunksize 100000`
+# runs the same steps chunk by chunk and appends to the output)
 loan.to_csv('Bondora_preprocessed.csv',index=False)
 
 
@@ -4,14 +4,87 @@
 # In[ ]:
 
 
-from flask import Flask, render_template, request
-import jsonify
+from flask import Flask, render_template, request, jsonify, g
 import requests
 import joblib
 import numpy as np
 import sklearn
+import os
+import scoring
+import codes
+import backends
+import forest_engine
+import pipeline
+import score_cache
+from registry import ModelRegistry, ServedModel
+from pipeline import CreditPipeline
 app = Flask(__name__)
-model = joblib.load("rf_jlib", 'r+')
+
+PIPELINE_PATH = os.environ.get('PIPELINE_PATH', 'credit_pipeline')
+MODEL_PATH = os.environ.get('MODEL_PATH', 'rf_jlib')
+MODEL_ENGINE_PATH = os.environ.get('MODEL_ENGINE_PATH', 'rf_engine')
+# rows per predict_proba call when scoring bulk uploads
+SCORE_CHUNK_ROWS = int(os.environ.get('SCORE_CHUNK_ROWS', 65536))
+
+def artifact_path():
+    # credit_pipeline (training transforms + compiled forest, from model_pipeline_ashish_1.py)
+    # is preferred; without it, serve the bare model and expect already-encoded features
+    for path in (PIPELINE_PATH, MODEL_ENGINE_PATH):
+        if os.path.exists(path):
+            return path
+    return MODEL_PATH
+
+def load_model(path):
+    # memory-mapped so workers share its pages; bare models are compiled if they are forests
+    if path == PIPELINE_PATH:
+        return pipeline.load(path)
+    if path == MODEL_ENGINE_PATH:
+        return CreditPipeline(model=forest_engine.load(path))
+    return CreditPipeline(model=backends.for_serving(joblib.load(path)))
+
+# requests a worker can have in flight at once: gunicorn's --threads (Procfile) or asgi.py's
+# scoring pool. A micro-batch can never hold more rows than that, so it is scored as soon as
+# it has that many rather than after waiting out SCORE_BATCH_WAIT_MS
+WEB_THREADS = int(os.environ.get('WEB_THREADS') or os.environ.get('SCORE_THREADS') or 8)
+
+def load_served(path, version):
+    # values outside the training range are scored with a warning; SCORE_RANGE_MARGIN=m
+    # rejects those beyond the range widened by m times its span instead
+    margin = os.environ.get('SCORE_RANGE_MARGIN')
+    return ServedModel(version, load_model(path),
+                       max_rows=int(os.environ.get('SCORE_BATCH_MAX_ROWS', WEB_THREADS)),
+                       max_wait=float(os.environ.get('SCORE_BATCH_WAIT_MS', 2)) / 1000,
+                       range_margin=float(margin) if margin else None)
+
+# loaded once at import, so gunicorn --preload does it in the master before forking; each
+# worker then polls the artifact every MODEL_POLL_SECONDS (0 disables) and swaps in a new
+# version once it is loaded and warmed. Concurrent single-row requests are scored together
+# by the served model's micro-batcher (gunicorn gthread workers)
+registry = ModelRegistry(artifact_path, load_served,
+                         poll_interval=float(os.environ.get('MODEL_POLL_SECONDS', 10)),
+                         on_swap=lambda served: cache.invalidate(served.version))
+# re-submitted applications are answered from here; entries are scoped to the model version.
+# SCORE_CACHE_URL (redis) shares them between workers, SCORE_CACHE_SIZE=0 disables the cache
+cache = score_cache.ScoreCache(registry.version,
+                               max_entries=int(os.environ.get('SCORE_CACHE_SIZE', 10000)),
+                               ttl=float(os.environ.get('SCORE_CACHE_TTL', 300)),
+                               shared=score_cache.shared_backend(os.environ.get('SCORE_CACHE_URL')))
+
+def reload_model():
+    """Swap in the current artifact now if it changed; the cache is invalidated on swap."""
+    return registry.refresh()
+
+def served_model():
+    # one model per request, so a swap mid-request cannot mix versions
+    g.served = registry.get()
+    return g.served
+
+@app.after_request
+def model_version_header(response):
+    if 'served' in g:
+        response.headers['X-Model-Version'] = g.served.version
+    return response
+
 @app.route('/',methods=['GET'])
 def Home():
     return render_template('index.html')
@@ -19,46 +92,88 @@ def Home():
 def predict():
     
     if request.method == 'POST':
-        NewCreditCustomer = request.form['NewCreditCustomer']
-        if(NewCreditCustomer==True):
-            NewCreditCustomer=1
-                
-        else:
-            NewCreditCustomer=0      
-        VerificationType=float(request.form['VerificationType'])
-        LanguageCode=int(request.form['LanguageCode'])
-        Gender=float(request.form['Gender'])
-        Education=int(request.form['Education'])
-        MaritalStatus=int(request.form['MaritalStatus'])
-        EmploymentStatus=int(request.form['EmploymentStatus'])
-        EmploymentDurationCurrentEmployer = int(request.form['EmploymentDurationCurrentEmployer'])
-        OccupationArea=int(request.form['OccupationArea'])
-        Restructured=request.form['Restructured']
-        if(Restructured==True):
-            Restructured=1      
-        else:
-            Restructured=0  
-        CreditScoreEsMicroL=int(request.form['CreditScoreEsMicroL'])
-        Age= int(request.form['Age'])
-        AppliedAmount = float(request.form['AppliedAmount']) 
-        Interest = float(request.form['Interest'])
-        LoanDuration = float(request.form['LoanDuration'])
-        IncomeTotal =  float(request.form['IncomeTotal'])
-        LiabilitiesTotal = float(request.form['LiabilitiesTotal'])
-        AmountOfPreviousLoansBeforeLoan = float(request.form['AmountOfPreviousLoansBeforeLoan'])
-
-
-
-        prediction=model.predict([[NewCreditCustomer,VerificationType,LanguageCode,Gender,Education,MaritalStatus,
-        EmploymentStatus,EmploymentDurationCurrentEmployer,OccupationArea,Restructured,CreditScoreEsMicroL,Age,AppliedAmount,Interest, LoanDuration,IncomeTotal,LiabilitiesTotal,AmountOfPreviousLoansBeforeLoan ]])
-        output=round(prediction[0],1)
-        if output<0:
-            return render_template('index.html',prediction_texts="defaulted")
+        served=served_model()
+        # typed and checked against the training schema in one pass; bad input is a 400, not a 500
+        row, error, warning = served.validator.validate_one(request.form)
+        if error is not None:
+            return render_template('index.html',prediction_text="Invalid application: %s" % error), 400
+        probability=cache.score(row, served.batcher.score, served.version)
+        if probability>0.5:
+            return render_template('index.html',prediction_text="defaulted")
         else:
             return render_template('index.html',prediction_text="Not defaulted")
     else:
         return render_template('index.html')
 
+@app.route("/v1/score", methods=['POST'])
+def score():
+    # machine-facing single application scoring: JSON in, JSON out, no template rendering
+    record = request.get_json(force=True, silent=True)
+    if not isinstance(record, dict):
+        return jsonify(error="expected a JSON object with the application features"), 400
+    served = served_model()
+    row, error, warning = served.validator.validate_one(record)
+    if error is not None:
+        return jsonify(error="invalid application: %s" % error), 400
+    probability = cache.score(row, served.batcher.score, served.version)
+    return jsonify(probability=probability, defaulted=probability > 0.5, warning=warning,
+                   model_version=served.version)
+
+@app.route("/v1/score/binary", methods=['POST'])
+def score_binary():
+    # dense model-input rows as little-endian float32, row-major (or an Arrow IPC stream): the
+    # body is used as the feature matrix as it is, with no per-field parsing. Probabilities come
+    # back as little-endian float32 unless JSON is asked for
+    served = served_model()
+    try:
+        X = scoring.payload_matrix(request.get_data(), request.mimetype, served.pipe.columns_)
+    except ImportError:
+        return jsonify(error="Arrow payloads need pyarrow on the server"), 415
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify(error="invalid payload: %s" % e), 400
+    proba = scoring.default_probability(served.pipe.model, X, SCORE_CHUNK_ROWS) if len(X) else np.empty(0)
+    if request.accept_mimetypes.best_match([scoring.BINARY_MIMETYPE, 'application/json']) == 'application/json':
+        return jsonify(probabilities=proba.tolist(), model_version=served.version)
+    return app.response_class(proba.astype('<f4').tobytes(), mimetype=scoring.BINARY_MIMETYPE)
+
+@app.route("/v1/stats", methods=['GET'])
+def stats():
+    # served model version and score cache hit/miss counters of this worker
+    return jsonify(model_version=registry.version, cache=cache.stats())
+
+@app.route("/v1/schema", methods=['GET'])
+def feature_schema():
+    # accepted values and ranges of every field, as the validator applies them
+    return jsonify(served_model().validator.schema.to_dict())
+
+@app.route("/v1/codes", methods=['GET'])
+def code_tables():
+    # the same code dictionaries Bondora_EDA.py decodes with, for labelling inputs and results
+    return jsonify({col: {'labels': table.labels, 'default': table.default}
+                    for col, table in codes.TABLES.items()})
+
+@app.route("/predict/batch", methods=['POST'])
+def predict_batch():
+    # one predict_proba call for the whole upload instead of one request per application
+    served = served_model()
+    try:
+        if 'file' in request.files:
+            rows = scoring.csv_records(request.files['file'].stream)
+        elif request.mimetype == 'text/csv':
+            rows = scoring.csv_records(request.get_data(as_text=True))
+        else:
+            rows = request.get_json(force=True)
+        if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+            # invalid rows are masked out and reported; the rest of the batch is still scored
+            X, valid, errors, warnings = served.validator.validate(rows)
+        else:
+            X = scoring.rows_to_matrix(rows, n_features=len(served.pipe.columns_))
+            valid = errors = warnings = None
+    except (AttributeError, KeyError, ValueError, TypeError) as e:
+        return jsonify(error="invalid batch: %s" % e), 400
+    return jsonify(model_version=served.version,
+                   **scoring.batch_result(served.pipe.model, X, valid, errors, warnings, SCORE_CHUNK_ROWS))
+
 if __name__=="__main__":
     app.run(debug=True)
 
@@ -0,0 +1,218 @@
+"""Asynchronous entry point serving the same routes as app.py.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+A plain ASGI callable, no framework: request bodies are read, parsed (JSON,
+form and CSV) and turned into model rows on the event loop, and only model
+evaluation goes to a bounded thread pool (WEB_THREADS or SCORE_THREADS,
+default 8, which also caps the micro-batch size), where single rows still
+meet in the served model's micro-batcher. The numpy tree walk releases the
+GIL, so one process with one memory-mapped model serves many concurrent
+connections; the model registry, hot reload and score cache are app.py's own.
+"""
+import asyncio
+import csv
+import io
+import json
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import numpy as np
+from jinja2 import Environment, FileSystemLoader
+
+import app as flask_app
+import codes
+import scoring
+
+
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', 16 * 2 ** 20))
+
+pool = ThreadPoolExecutor(max_workers=flask_app.WEB_THREADS, thread_name_prefix='score')
+templates = Environment(loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), 'templates')))
+# the form posts to url_for('predict') as in the Flask app
+templates.globals['url_for'] = lambda endpoint: '/' + endpoint
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "request body over %d bytes" % MAX_BODY_BYTES)
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def header(scope, key):
+    for name, value in scope['headers']:
+        if name == key:
+            return value.decode('latin-1')
+    return ''
+
+
+def content_type(scope):
+    return header(scope, b'content-type').split(';')[0].strip().lower()
+
+
+async def send_response(send, status, body, content='application/json', version=None):
+    headers = [(b'content-type', content.encode()), (b'content-length', str(len(body)).encode())]
+    if version is not None:
+        headers.append((b'x-model-version', version.encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def json_body(payload):
+    return json.dumps(payload).encode()
+
+
+async def offload(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+async def score_row(served, row):
+    return await offload(flask_app.cache.score, row, served.batcher.score, served.version)
+
+
+async def home(scope, body, served):
+    return 200, templates.get_template('index.html').render().encode(), 'text/html; charset=utf-8'
+
+
+async def predict(scope, body, served):
+    try:
+        form = dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+    except UnicodeDecodeError:
+        page = templates.get_template('index.html').render(prediction_text="Invalid application: form is not UTF-8")
+        return 400, page.encode(), 'text/html; charset=utf-8'
+    row, error, warning = served.validator.validate_one(form)
+    if error is not None:
+        page = templates.get_template('index.html').render(prediction_text="Invalid application: %s" % error)
+        return 400, page.encode(), 'text/html; charset=utf-8'
+    probability = await score_row(served, row)
+    text = "defaulted" if probability > 0.5 else "Not defaulted"
+    return 200, templates.get_template('index.html').render(prediction_text=text).encode(), 'text/html; charset=utf-8'
+
+
+async def score(scope, body, served):
+    try:
+        record = json.loads(body)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict):
+        raise HTTPError(400, "expected a JSON object with the application features")
+    row, error, warning = served.validator.validate_one(record)
+    if error is not None:
+        raise HTTPError(400, "invalid application: %s" % error)
+    probability = await score_row(served, row)
+    return 200, json_body({'probability': probability, 'defaulted': probability > 0.5, 'warning': warning,
+                           'model_version': served.version}), 'application/json'
+
+
+async def predict_batch(scope, body, served):
+    kind = content_type(scope)
+    if kind == 'multipart/form-data':
+        raise HTTPError(415, "post the CSV as a text/csv body")
+    try:
+        if kind == 'text/csv':
+            rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+        else:
+            rows = json.loads(body)
+        if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+            X, valid, errors, warnings = served.validator.validate(rows)
+        else:
+            X = scoring.rows_to_matrix(rows, n_features=len(served.pipe.columns_))
+            valid = errors = warnings = None
+    except (AttributeError, KeyError, ValueError, TypeError) as e:
+        raise HTTPError(400, "invalid batch: %s" % e)
+    result = await offload(scoring.batch_result, served.pipe.model, X, valid, errors, warnings,
+                           flask_app.SCORE_CHUNK_ROWS)
+    return 200, json_body(dict(result, model_version=served.version)), 'application/json'
+
+
+async def score_binary(scope, body, served):
+    # the body bytes are the feature matrix (np.frombuffer), see app.score_binary
+    try:
+        X = scoring.payload_matrix(body, content_type(scope), served.pipe.columns_)
+    except ImportError:
+        raise HTTPError(415, "Arrow payloads need pyarrow on the server")
+    except (KeyError, ValueError, TypeError) as e:
+        raise HTTPError(400, "invalid payload: %s" % e)
+    proba = np.empty(0)
+    if len(X):
+        proba = await offload(scoring.default_probability, served.pipe.model, X, flask_app.SCORE_CHUNK_ROWS)
+    if 'application/json' in header(scope, b'accept'):
+        return 200, json_body({'probabilities': proba.tolist(), 'model_version': served.version}), 'application/json'
+    return 200, proba.astype('<f4').tobytes(), scoring.BINARY_MIMETYPE
+
+
+async def stats(scope, body, served):
+    return 200, json_body({'model_version': served.version, 'cache': flask_app.cache.stats()}), 'application/json'
+
+
+async def feature_schema(scope, body, served):
+    return 200, json_body(served.validator.schema.to_dict()), 'application/json'
+
+
+async def code_tables(scope, body, served):
+    return 200, json_body({col: {'labels': table.labels, 'default': table.default}
+                           for col, table in codes.TABLES.items()}), 'application/json'
+
+
+ROUTES = {('GET', '/'): home,
+          ('POST', '/predict'): predict,
+          ('POST', '/v1/score'): score,
+          ('POST', '/predict/batch'): predict_batch,
+          ('POST', '/v1/score/binary'): score_binary,
+          ('GET', '/v1/stats'): stats,
+          ('GET', '/v1/schema'): feature_schema,
+          ('GET', '/v1/codes'): code_tables}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            pool.shutdown(wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        methods = [method for method, path in ROUTES if path == scope['path']]
+        status = 405 if methods else 404
+        return await send_response(send, status, json_body({'error': 'method not allowed' if methods
+                                                            else 'not found'}))
+    # one model per request, so a swap mid-request cannot mix versions
+    served = flask_app.registry.get()
+    try:
+        body = await read_body(receive)
+        status, payload, content = await handler(scope, body, served)
+    except HTTPError as e:
+        status, payload, content = e.status, json_body({'error': str(e)}), 'application/json'
+    except Exception:
+        # as Flask does: log the traceback and answer 500 rather than drop the connection
+        traceback.print_exc()
+        status, payload, content = 500, json_body({'error': 'internal server error'}), 'application/json'
+    await send_response(send, status, payload, content, served.version)
@@ -0,0 +1,81 @@
+"""Model backends the training scripts can fit and app.py can serve.
+
+    model = backends.make('hist_gb')               # or 'forest'; MODEL_BACKEND in the scripts
+    model.fit(X_train, y_train)
+    credit_pipeline.model = backends.for_serving(model)
+    backends.benchmark(model, X_test, 'credit_pipeline')
+
+'forest' is the RandomForestClassifier of model_pipeline_ashish_1.py. 'hist_gb'
+is sklearn's HistGradientBoostingClassifier: features are bucketed into at
+most 255 bins once, so split search costs O(bins) instead of a sort per node,
+and the model is a few hundred shallow trees rather than 200 depth-10 trees.
+The label-encoded columns are passed to it as categorical features.
+
+Both expose predict_proba/classes_, so classification_report, CreditPipeline,
+the batcher and joblib artifacts work the same for either; for_serving() only
+compiles forests (forest_engine.CompiledForest) and returns anything else as is.
+"""
+import os
+import time
+
+import numpy as np
+
+import scoring
+from pipeline import ENCODED
+
+
+FOREST_PARAMS = {'bootstrap': True, 'max_depth': 10, 'max_features': 'sqrt', 'min_samples_leaf': 1,
+                 'min_samples_split': 2, 'n_estimators': 200}
+
+# label codes sit at the same positions in FEATURES and in the PCA layout (categoricals first)
+HIST_GB_PARAMS = {'max_iter': 300, 'learning_rate': 0.1, 'max_leaf_nodes': 31, 'early_stopping': True,
+                  'categorical_features': [scoring.FEATURES.index(col) for col in ENCODED],
+                  'random_state': 0}
+
+
+def forest(**params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**dict(FOREST_PARAMS, **params))
+
+
+def hist_gb(**params):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(**dict(HIST_GB_PARAMS, **params))
+
+
+BACKENDS = {'forest': forest, 'hist_gb': hist_gb}
+
+
+def make(name, **params):
+    if name not in BACKENDS:
+        raise ValueError("unknown model backend %r, expected one of %s" % (name, sorted(BACKENDS)))
+    return BACKENDS[name](**params)
+
+
+def is_forest(model):
+    return hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_')
+
+
+def for_serving(model):
+    """The object app.py scores with: a CompiledForest for forests, the model itself otherwise."""
+    if is_forest(model):
+        from forest_engine import CompiledForest
+        return CompiledForest.from_estimator(model)
+    return model
+
+
+def benchmark(model, X, path=None, repeats=200):
+    """Artifact size and scoring latency (median single row, rows/s on all of X)."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    single = []
+    for i in range(repeats):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - start
+    return {'artifact_mb': os.path.getsize(path) / 2 ** 20 if path else None,
+            'single_row_ms': float(np.median(single)) * 1000,
+            'rows_per_s': len(X) / batch}
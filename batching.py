@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# every live batcher, held weakly so a replaced model (and its memory-mapped file) can be freed
+_batchers = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    # gunicorn --preload forks after import; threads do not survive the fork
+    for batcher in list(_batchers):
+        batcher._reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row scoring calls into one matrix call.
+
+    Request threads submit one feature row each and block on a Future. A
+    background thread stacks whatever is pending (up to max_rows) and calls
+    score_fn once, then hands every caller its own result. The wait window is
+    adaptive: when the previous batch held a single row the server is idle and
+    the next row is dispatched immediately, so only loaded workers pay up to
+    max_wait seconds of extra latency to fill a batch. A full batch goes at
+    once, so max_rows should be the number of threads that can submit: with
+    more, every batch would wait out max_wait for rows that cannot come.
+    """
+
+    def __init__(self, score_fn, max_rows=8, max_wait=0.002):
+        self.score_fn = score_fn
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._reset()
+        _batchers.add(self)
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self._pending = []
+        self._thread = None
+        self._last_size = 1
+        self._closed = False
+
+    def close(self):
+        """Let the batching thread exit once nothing is pending (a later submit restarts it)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def submit(self, row):
+        future = Future()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+            self._pending.append((row, future))
+            self._cond.notify()
+        return future
+
+    def score(self, row):
+        return self.submit(row).result()
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    self._thread = None
+                    return None
+                self._cond.wait()
+            if self._last_size > 1:
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = self._pending[:self.max_rows]
+            del self._pending[:self.max_rows]
+            self._last_size = len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            rows, futures = zip(*batch)
+            try:
+                results = self.score_fn(np.vstack(rows))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future, result in zip(futures, results):
+                    future.set_result(result)
@@ -0,0 +1,89 @@
+"""Pearson correlation matrix for the EDA heatmaps, computed once per frame.
+
+    corr = correlation.corr(df)
+    mask = np.triu(np.ones_like(corr, dtype=np.bool))
+    sns.heatmap(corr, mask=mask, ...)
+
+Same result as df.corr() (numeric columns, pairwise complete observations)
+to float32 precision. Columns are standardised first, then the pairwise sums
+come from float32 matrix products over row blocks accumulated in float64.
+NaNs are zeroed and tracked by a 0/1 presence mask, so every pair's counts,
+sums and sums of squares over the rows where both columns are present are
+matrix products as well. Results are memoized on a hash of the frame's
+content, so the mask and the heatmap (and any later cell on an unchanged
+frame) reuse one computation.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+_CACHE = OrderedDict()
+CACHE_SIZE = 8
+
+
+def frame_version(df):
+    """Content hash of a frame: values, index and column names."""
+    rows = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hash((rows.tobytes(), tuple(df.columns)))
+
+
+def _numeric(df):
+    return df.select_dtypes(include=['number', 'bool'])
+
+
+def _pairwise(X, block_size):
+    """Pairwise-complete correlations of the columns of X (float64, NaN = missing)."""
+    present = ~np.isnan(X)
+    # standardise on each column's own rows so the float32 products below do not cancel
+    mean = np.nanmean(X, axis=0)
+    scale = np.nanstd(X, axis=0)
+    scale[~(scale > 0)] = 1.0
+    k = X.shape[1]
+    complete = present.all()
+    xy = np.zeros((k, k))
+    if complete:
+        x = np.zeros(k)
+    else:
+        n, x, xx = np.zeros((k, k)), np.zeros((k, k)), np.zeros((k, k))
+    for start in range(0, len(X), block_size):
+        z = ((X[start:start + block_size] - mean) / scale).astype(np.float32)
+        if complete:
+            x += z.sum(axis=0, dtype=np.float64)
+        else:
+            m = present[start:start + block_size].astype(np.float32)
+            z[m == 0] = 0
+            n += m.T @ m
+            x += z.T @ m            # [i, j]: sum of column i over the rows where j is present
+            xx += (z * z).T @ m
+        xy += z.T @ z
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if complete:
+            n = len(X)
+            cov = xy - np.outer(x, x) / n
+            var_i = np.diag(cov)[:, None]
+        else:
+            cov = xy - x * x.T / n
+            var_i = xx - x ** 2 / n
+        out = cov / np.sqrt(var_i * var_i.T)
+    out = np.clip(out, -1, 1)
+    diagonal = np.diag_indices(k)
+    out[diagonal] = np.where(np.isfinite(out[diagonal]), 1.0, np.nan)
+    return out
+
+
+def corr(df, block_size=65536):
+    """df.corr() as a float32 DataFrame, memoized per frame version."""
+    numeric = _numeric(df)
+    key = (frame_version(numeric), block_size)
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+    X = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    result = pd.DataFrame(_pairwise(X, block_size).astype(np.float32),
+                          index=numeric.columns, columns=numeric.columns)
+    _CACHE[key] = result
+    if len(_CACHE) > CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
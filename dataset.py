@@ -0,0 +1,93 @@
+"""Compact on-disk form of the model input table (credit_pipeline_1.csv).
+
+    data = CompactDataset.from_frame(aftr_pca, target='Status')    # model_RF_concat.py
+    data.save('credit_pipeline_1.data')
+    X, y = dataset.load('credit_pipeline_1.data').arrays()          # model_pipeline_ashish_1.py
+
+Read with pandas, the table is float64/int64: 8 bytes for cells such as
+Gender or Education that hold a handful of label codes. Columns whose values
+are all integers in 0..255 (label codes, flags, Age, LoanDuration) are stored
+as uint8 and the others as float32, each block one Fortran-ordered array.
+arrays() widens them into the float32 Fortran-ordered matrix the sklearn tree
+builder works on, so fitting neither casts nor copies X again.
+"""
+import joblib
+import numpy as np
+
+
+def _is_code(values):
+    # lossless as uint8: no missing values, integral, inside 0..255
+    return (values.size and not np.isnan(values).any() and values.min() >= 0 and values.max() <= 255
+            and np.array_equal(values, np.round(values)))
+
+
+class CompactDataset:
+
+    def __init__(self, columns, codes, code_columns, amounts, amount_columns, target=None, target_name=None):
+        self.columns = list(columns)
+        self.codes = codes
+        self.code_columns = list(code_columns)
+        self.amounts = amounts
+        self.amount_columns = list(amount_columns)
+        self.target = target
+        self.target_name = target_name
+
+    @classmethod
+    def from_frame(cls, df, target=None, columns=None):
+        """Split a DataFrame into a uint8 code block and a float32 amount block."""
+        if columns is None:
+            columns = [col for col in df.columns if col != target]
+        code_columns, amount_columns = [], []
+        for col in columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            (code_columns if _is_code(values) else amount_columns).append(col)
+        codes = np.asfortranarray(df[code_columns].to_numpy(dtype=np.uint8))
+        amounts = np.asfortranarray(df[amount_columns].to_numpy(dtype=np.float32))
+        y = None
+        if target is not None:
+            y = df[target].to_numpy()
+            if _is_code(y.astype(np.float64)):
+                y = y.astype(np.uint8)
+        return cls(columns, codes, code_columns, amounts, amount_columns, y, target)
+
+    @classmethod
+    def read_csv(cls, path, target=None, index_col=0):
+        import pandas as pd
+        return cls.from_frame(pd.read_csv(path, low_memory=False, index_col=index_col), target=target)
+
+    def __len__(self):
+        return len(self.codes) if self.code_columns else len(self.amounts)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.amounts.nbytes + (0 if self.target is None else self.target.nbytes)
+
+    def matrix(self, columns=None):
+        """float32 Fortran-ordered feature matrix, columns in their original order."""
+        columns = self.columns if columns is None else columns
+        X = np.empty((len(self), len(columns)), dtype=np.float32, order='F')
+        for j, col in enumerate(columns):
+            if col in self.code_columns:
+                X[:, j] = self.codes[:, self.code_columns.index(col)]
+            else:
+                X[:, j] = self.amounts[:, self.amount_columns.index(col)]
+        return X
+
+    def arrays(self, columns=None):
+        return self.matrix(columns), self.target
+
+    def save(self, path):
+        # uncompressed so load() can memory-map the blocks
+        joblib.dump(self, path, compress=0)
+
+
+def take(X, rows):
+    """X[rows] as a Fortran-ordered array (numpy's fancy indexing returns C order)."""
+    out = np.empty((len(rows), X.shape[1]), dtype=X.dtype, order='F')
+    for j in range(X.shape[1]):
+        out[:, j] = X[rows, j]
+    return out
+
+
+def load(path):
+    return joblib.load(path, mmap_mode='r')
@@ -13,6 +13,7 @@ import matplotlib.pyplot as plt
 from statsmodels.graphics.mosaicplot import mosaic
 from itertools import product
 import seaborn as sns
+import correlation
 
 
 # In[2]:
@@ -48,7 +49,10 @@ df_eng.shape
 # In[155]:
 
 
-df_samp=df_eng.sample(n=500)
+# rows to score and tune on; None uses the whole dataset (practical with the binned MI
+# scores and SEARCH = 'halving' below)
+SAMPLE_ROWS = None
+df_samp = df_eng.sample(n=SAMPLE_ROWS) if SAMPLE_ROWS else df_eng.copy()
 
 
 # In[156]:
@@ -85,13 +89,12 @@ discrete_features = X.dtypes == int
 # In[159]:
 
 
-from sklearn.feature_selection import mutual_info_regression
+# binned classification MI over all columns at once (see feature_scoring.py), instead of
+# kNN mutual_info_regression per column; fast enough for every row
+from feature_scoring import mi_scores as binned_mi_scores
 
 def make_mi_scores(X, y, discrete_features):
-    mi_scores = mutual_info_regression(X, y, discrete_features=discrete_features)
-    mi_scores = pd.Series(mi_scores, name="MI Scores", index=X.columns)
-    mi_scores = mi_scores.sort_values(ascending=False)
-    return mi_scores
+    return binned_mi_scores(X, y, discrete_features=discrete_features)
 
 mi_scores = make_mi_scores(X, y, discrete_features)
 
@@ -147,8 +150,10 @@ df_mutual.dtypes
 
 plt.figure(figsize=(20, 20))
 # define the mask to set the values in the upper triangle to True
-mask = np.triu(np.ones_like(df_mutual.corr(), dtype=np.bool))
-heatmap = sns.heatmap(df_mutual.corr(), mask=mask, vmin=-1, vmax=1, annot=False, cmap='BrBG')
+# computed once (float32, memoized on the frame's content) for both the mask and the heatmap
+corr = correlation.corr(df_mutual)
+mask = np.triu(np.ones_like(corr, dtype=np.bool))
+heatmap = sns.heatmap(corr, mask=mask, vmin=-1, vmax=1, annot=False, cmap='BrBG')
 heatmap.set_title('Triangle Correlation Heatmap', fontdict={'fontsize':18}, pad=40);
 
 
@@ -191,83 +196,53 @@ df_cateogry.head()
 # In[173]:
 
 
+# scaler and PCA are fitted in batches of PCA_BATCH rows (reduction.py), so the standardised
+# copy of the numeric columns is never held whole
+import reduction
 from sklearn import preprocessing
-scalar=preprocessing.StandardScaler()
-df_numerical_std_1=scalar.fit_transform(df_numerical)
-
-
-# In[ ]:
-
-
-
+PCA_BATCH = 50000
+N_COMPONENTS = 5
+label_columns = ['NewCreditCustomer', 'Restructured', 'LanguageCode', 'Education','MaritalStatus','EmploymentStatus','EmploymentDurationCurrentEmployer','OccupationArea','CreditScoreEsMicroL']
+
+def build_features():
+    numeric_chunks = lambda: reduction.frame_chunks(df_numerical, PCA_BATCH)
+    scalar = reduction.fit_scaler(numeric_chunks())
+    # Create principal components
+    pca = reduction.fit_pca(scalar, numeric_chunks(), n_components=N_COMPONENTS)
+    X_pca = reduction.transform(scalar, pca, numeric_chunks())
+    print(pca.explained_variance_ratio_)
+    # Convert to dataframe
+    component_names = [f"PC{i+1}" for i in range(X_pca.shape[1])]
+    X_pca = pd.DataFrame(X_pca, columns=component_names)
+    aftr_pca=pd.concat([df_cateogry,X_pca],axis=1)
+    le = preprocessing.LabelEncoder()
+    aftr_pca[label_columns]= aftr_pca[label_columns].apply(le.fit_transform)
+    return aftr_pca.drop(['status'],axis=1), aftr_pca["status"]
 
 
 # In[174]:
 
 
-from sklearn.decomposition import PCA
-
-# Create principal components
-pca = PCA(n_components=5)
-X_pca = pca.fit_transform(df_numerical_std_1)
-
-# Convert to dataframe
-component_names = [f"PC{i+1}" for i in range(X_pca.shape[1])]
-X_pca = pd.DataFrame(X_pca, columns=component_names)
-
-X_pca.head()
-
-
-# In[175]:
-
-
-pca.explained_variance_ratio_
-
-
-# In[176]:
-
-
-aftr_pca=pd.concat([df_cateogry,X_pca],axis=1)
-
-
-# In[177]:
-
-
-aftr_pca
-
-
-# In[178]:
-
-
-categ=aftr_pca[['LanguageCode','Education','MaritalStatus','EmploymentStatus','EmploymentDurationCurrentEmployer','OccupationArea','CreditScoreEsMicroL']]
-
-
-# In[179]:
-
-
-le = preprocessing.LabelEncoder()
-aftr_pca[['NewCreditCustomer', 'Restructured']]= aftr_pca[['NewCreditCustomer', 'Restructured']].apply(le.fit_transform)
-
-
-# In[180]:
-
-
-aftr_pca[['LanguageCode', 'Education','MaritalStatus','EmploymentStatus','EmploymentDurationCurrentEmployer','OccupationArea','CreditScoreEsMicroL']]= aftr_pca[['LanguageCode', 'Education','MaritalStatus','EmploymentStatus','EmploymentDurationCurrentEmployer','OccupationArea','CreditScoreEsMicroL']].apply(le.fit_transform)
-
-
-# In[181]:
-
-
-aftr_pca.dtypes
+# float32 X, y and CV fold ids come memory-mapped from .cache/features when Data_preprocessing.csv
+# and the parameters below have not changed; build_features() (scaler, PCA and label encoding)
+# only runs on the first run after a change. With SAMPLE_ROWS set, the first sample is kept
+from feature_cache import cached_features, split
+X, y, folds = cached_features('Data_preprocessing.csv',
+                              {'target': 'status', 'sample_rows': SAMPLE_ROWS, 'impute': 'most_frequent',
+                               'dropped': cols_del, 'numeric': list(df_numerical.columns),
+                               'label_encoded': label_columns, 'pca_components': N_COMPONENTS, 'layout': 'F'},
+                              build_features)
+X.shape, X.dtype
 
 
 # In[182]:
 
 
-X = aftr_pca.copy()
-y = aftr_pca["status"]
+import dataset
 from sklearn.model_selection import train_test_split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size = 0.20, random_state = 0)
+train_rows, test_rows = train_test_split(np.arange(len(y)), test_size = 0.20, random_state = 0)
+X_train, X_test = dataset.take(X, train_rows), dataset.take(X, test_rows)
+y_train, y_test = y[train_rows], y[test_rows]
 
 
 # In[183]:
@@ -300,17 +275,35 @@ params = {'bootstrap': [True, False],
 # In[186]:
 
 
-from sklearn.model_selection import GridSearchCV
-grid_search = GridSearchCV(estimator=random_classifier,
-                           param_grid=params,
-                           cv = 3,
-                           n_jobs=-1, verbose=1, scoring="accuracy")
+# 'grid' fits all 3,960 configurations x 3 folds; 'halving' scores them on a small budget of
+# rows and trees and only grows the budget for the best third each round
+SEARCH = 'halving'
 
 
 # In[187]:
 
 
-grid_search.fit(X_train, y_train)
+# the search runs TRAIN_N_JOBS worker processes, so each forest inside it stays single-threaded
+# (and the stage reports wall time only: their CPU time is not this process's)
+from parallel import ParallelPolicy
+policy = ParallelPolicy.from_env()
+search_classifier = policy.configure(random_classifier, n_jobs=1)
+with policy.stage('%s search' % SEARCH, processes=True):
+    if SEARCH == 'grid':
+        from sklearn.model_selection import GridSearchCV
+        grid_search = GridSearchCV(estimator=search_classifier,
+                                   param_grid=params,
+                                   cv = 3,
+                                   n_jobs=policy.n_jobs, verbose=1, scoring="accuracy")
+        grid_search.fit(X_train, y_train)
+        best_params, best_score = grid_search.best_params_, grid_search.best_score_
+    else:
+        from tuning import successive_halving
+        halving = successive_halving(search_classifier, params, X_train, y_train, cv=3, eta=3,
+                                     min_rows=min(500, len(X_train) // 3), min_trees=20,
+                                     scoring="accuracy", n_jobs=policy.n_jobs, verbose=1)
+        best_params, best_score = halving.best_params_, halving.best_score_
+best_params, best_score
 
 
 # In[ ]:
@@ -0,0 +1,68 @@
+"""On-disk cache of finished training matrices.
+
+    X, y, folds = cached_features('credit_pipeline_1.csv', {'target': 'Status'}, build)
+
+build() is only called on a miss; it returns the feature matrix and label
+vector however the notebook makes them (CSV parsing, imputation, encoding,
+scaling, PCA...). The float32 X (Fortran-ordered, see dataset.py), the labels and a stratified fold id per row
+are stored as .npy files under a directory named after the sha256 of the
+source file and the transform parameters, and are returned memory-mapped, so
+repeated training and tuning runs skip both parsing and transformation.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+from ingest import CACHE_DIR, file_digest
+
+
+FEATURE_CACHE_DIR = os.path.join(CACHE_DIR, 'features')
+
+
+def cache_key(sources, params):
+    """sha256 over the content of every source file and the JSON of params."""
+    if isinstance(sources, str):
+        sources = [sources]
+    payload = json.dumps([[file_digest(path) for path in sources], params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def cached_features(sources, params, build, n_folds=3, random_state=0, root=FEATURE_CACHE_DIR):
+    """(X, y, folds) for sources+params, memory-mapped read-only; build() runs on a miss."""
+    params = dict(params, n_folds=n_folds, random_state=random_state)
+    path = os.path.join(root, cache_key(sources, params))
+    if not os.path.isdir(path):
+        X, y = build()
+        X = np.asfortranarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        if y.dtype == object:
+            # object labels (e.g. from an imputed frame) cannot be memory-mapped; store them
+            # as the int, float or string array their values make
+            y = np.array(y.tolist())
+        folds = np.empty(len(y), dtype=np.int8)
+        for k, (_, test) in enumerate(StratifiedKFold(n_folds, shuffle=True,
+                                                      random_state=random_state).split(X, y)):
+            folds[test] = k
+        # written to a temporary directory and renamed, so a crashed run never leaves half an entry
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=root)
+        for name, array in (('X', X), ('y', y), ('folds', folds)):
+            np.save(os.path.join(tmp, name + '.npy'), array)
+        with open(os.path.join(tmp, 'params.json'), 'w') as f:
+            json.dump(params, f, default=str)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # another run filled the same entry first
+            shutil.rmtree(tmp)
+    return tuple(np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ('X', 'y', 'folds'))
+
+
+def split(folds):
+    """(train, test) index pairs for a fold id vector; usable as cv= in sklearn."""
+    return [(np.flatnonzero(folds != k), np.flatnonzero(folds == k)) for k in range(int(folds.max()) + 1)]
@@ -0,0 +1,93 @@
+"""Mutual information between every feature and a class label, from bin counts.
+
+    mi = mi_scores(X, y, discrete_features=X.dtypes == int)    # sorted pd.Series, nats
+
+mutual_info_regression treats the 0/1 Status as continuous and runs a kNN
+estimate per continuous column, which is why the notebooks scored MI on a
+500-row sample. Here continuous columns are cut into n_bins equal-frequency
+bins, discrete columns keep one bin per value, and MI is read off the
+(bin, class) contingency table. The tables of a whole chunk of columns come
+from one np.bincount over offset bin ids, and chunks are scored in parallel
+threads, so the full dataset is ranked in seconds.
+
+Binned MI is biased upwards by roughly (bins - 1) * (classes - 1) / (2 n), so
+scores of columns with very different bin counts are only comparable on large n.
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+
+def _discrete_mask(X, discrete_features):
+    n_features = X.shape[1]
+    if isinstance(discrete_features, str) and discrete_features == 'auto':
+        if hasattr(X, 'dtypes'):
+            return np.array([pd.api.types.is_integer_dtype(dtype) for dtype in X.dtypes])
+        return np.full(n_features, np.issubdtype(np.asarray(X).dtype, np.integer))
+    if isinstance(discrete_features, (bool, np.bool_)):
+        return np.full(n_features, bool(discrete_features))
+    mask = np.asarray(discrete_features)
+    if mask.dtype != bool:
+        indices, mask = mask, np.zeros(n_features, dtype=bool)
+        mask[indices] = True
+    return mask
+
+
+def _bin(values, discrete, n_bins):
+    """Bin ids 0..k-1 of one column and k; missing values get a bin of their own."""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if discrete:
+        _, ids = np.unique(np.where(missing, 0, values), return_inverse=True)
+    else:
+        present = values[~missing]
+        edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)[1:-1])) if len(present) else []
+        ids = np.searchsorted(edges, values, side='right')
+    ids = ids.astype(np.int64)
+    k = int(ids.max()) + 1 if len(ids) else 1
+    if missing.any():
+        ids[missing] = k
+        k += 1
+    return ids, k
+
+
+def _chunk_mi(columns, discrete, y_ids, n_classes, n_bins):
+    binned = [_bin(values, is_discrete, n_bins) for values, is_discrete in zip(columns, discrete)]
+    sizes = np.array([k for _, k in binned])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    # one contingency table per column, all stacked along the bin axis
+    ids = np.concatenate([b + offset for (b, _), offset in zip(binned, offsets)])
+    counts = np.bincount(ids * n_classes + np.tile(y_ids, len(binned)),
+                         minlength=sizes.sum() * n_classes).reshape(-1, n_classes).astype(np.float64)
+    n = len(y_ids)
+    p_xy = counts / n
+    p_x = p_xy.sum(axis=1, keepdims=True)
+    p_y = np.bincount(y_ids, minlength=n_classes) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(p_xy > 0, p_xy * np.log(p_xy / (p_x * p_y)), 0.0)
+    per_bin = terms.sum(axis=1)
+    return np.add.reduceat(per_bin, offsets)
+
+
+def mi_scores(X, y, discrete_features='auto', n_bins=32, n_jobs=-1, chunk_size=8):
+    """MI (nats) of every column of X with the labels y.
+
+    discrete_features: 'auto' (integer dtypes), a bool, a boolean mask or column
+    indices, as for sklearn's mutual_info_*. Returns a pd.Series sorted in
+    descending order, indexed by X's columns when X is a DataFrame.
+    """
+    mask = _discrete_mask(X, discrete_features)
+    names = list(X.columns) if hasattr(X, 'columns') else list(range(X.shape[1]))
+    if hasattr(X, 'columns'):
+        columns = [X[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in names]
+    else:
+        X = np.asarray(X, dtype=np.float64)
+        columns = [X[:, j] for j in range(X.shape[1])]
+    _, y_ids = np.unique(np.asarray(y), return_inverse=True)
+    n_classes = int(y_ids.max()) + 1
+    chunks = range(0, len(columns), chunk_size)
+    scores = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_chunk_mi)(columns[i:i + chunk_size], mask[i:i + chunk_size], y_ids, n_classes, n_bins)
+        for i in chunks)
+    scores = np.clip(np.concatenate(scores), 0, None)
+    return pd.Series(scores, name="MI Scores", index=names).sort_values(ascending=False)
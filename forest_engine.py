@@ -0,0 +1,169 @@
+import os
+
+import joblib
+import numpy as np
+
+
+class CompiledForest:
+    """A fitted sklearn forest classifier flattened into packed node arrays.
+
+    All trees share one set of arrays; a leaf points left and right at itself,
+    so walking every tree for every row is just max_depth rounds of array
+    lookups with no per-estimator Python loop. Leaf values are normalised the
+    same way DecisionTreeClassifier.predict_proba does it and are summed in
+    estimator order, so predict_proba matches the sklearn forest bit for bit.
+
+    children[i] holds (right, left) of node i so the comparison result can be
+    used directly as the column index.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes_,
+                 n_features_in_, missing_go_to_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes_
+        self.n_features_in_ = n_features_in_
+        self.missing_go_to_left = missing_go_to_left
+
+    @classmethod
+    def from_estimator(cls, forest):
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("only single-output forest classifiers can be compiled")
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        n_classes = len(forest.classes_)
+        sizes = np.array([tree.node_count for tree in trees])
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+        feature, threshold, children, value, missing = [], [], [], [], []
+        for root, tree in zip(roots, trees):
+            nodes = np.arange(tree.node_count, dtype=np.int32) + root
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            threshold.append(_float32_floor(tree.threshold))
+            left = np.where(leaf, nodes, tree.children_left + root)
+            right = np.where(leaf, nodes, tree.children_right + root)
+            children.append(np.stack([right, left], axis=1).astype(np.int32))
+            # same arithmetic as DecisionTreeClassifier.predict_proba, done once per node
+            proba = tree.value[:, 0, :n_classes].copy()
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            value.append(proba)
+            if hasattr(tree, 'missing_go_to_left'):
+                missing.append(tree.missing_go_to_left.astype(bool))
+
+        return cls(feature=np.concatenate(feature),
+                   threshold=np.concatenate(threshold),
+                   children=np.concatenate(children),
+                   value=np.concatenate(value),
+                   roots=roots,
+                   max_depth=max(tree.max_depth for tree in trees),
+                   classes_=np.asarray(forest.classes_),
+                   n_features_in_=forest.n_features_in_,
+                   missing_go_to_left=np.concatenate(missing) if missing else None)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def _check(self, X):
+        # sklearn casts to float32 before comparing against the thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError("expected a 2-d array with %d features" % self.n_features_in_)
+        return X
+
+    def _walk(self, X):
+        # one block of rows; every step writes into the same few (n_trees, n_rows) buffers
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=self.feature.dtype) * n_features)[np.newaxis, :]
+        node = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        index = np.empty(node.shape, dtype=self.feature.dtype)
+        x = np.empty(node.shape, dtype=np.float32)
+        threshold = np.empty(node.shape, dtype=self.threshold.dtype)
+        go_left = np.empty(node.shape, dtype=bool)
+        children = self.children.ravel()
+        has_missing = self.missing_go_to_left is not None and np.isnan(flat).any()
+        for _ in range(self.max_depth):
+            np.take(self.feature, node, out=index)
+            index += row_offset
+            np.take(flat, index, out=x)
+            np.take(self.threshold, node, out=threshold)
+            np.less_equal(x, threshold, out=go_left)
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_go_to_left[node]
+            node *= 2
+            node += go_left
+            np.take(children, node, out=node)
+        return node
+
+    def apply(self, X, block_rows=512):
+        """Leaf index (into the packed arrays) reached by every row in every tree."""
+        X = self._check(X)
+        return np.concatenate([self._walk(X[start:start + block_rows])
+                               for start in range(0, max(X.shape[0], 1), block_rows)], axis=1)
+
+    def predict_proba(self, X, block_rows=512):
+        # rows are walked block_rows at a time: for a whole bulk upload the (n_trees, n_rows)
+        # buffers would not fit in cache (hundreds of MB at 65k rows x 200 trees).
+        # Trees are added one after another in estimator order, like the forest's
+        # accumulator: np.add.accumulate is always sequential, where np.add.reduce may
+        # sum pairwise (and so differ in the last bit) when the tree axis is contiguous
+        X = self._check(X)
+        proba = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], block_rows):
+            leaves = self._walk(X[start:start + block_rows])
+            proba[start:start + block_rows] = np.add.accumulate(self.value[leaves], axis=0)[-1]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        dump(self, path)
+
+
+def _float32_floor(threshold):
+    """Largest float32 <= each threshold.
+
+    For a float32 x, x <= t holds exactly when x <= _float32_floor(t), so the walk
+    compares in float32 and still splits every row the way sklearn does.
+    """
+    with np.errstate(over='ignore'):
+        floor = threshold.astype(np.float32)
+    above = floor > threshold
+    floor[above] = np.nextafter(floor[above], np.float32(-np.inf))
+    return floor
+
+
+def dump(obj, path):
+    """joblib.dump for serving artifacts, replacing `path` atomically.
+
+    Uncompressed, so every numpy array lands in the file as a raw, mappable
+    buffer. Written aside and renamed: serving workers may have the old file
+    memory-mapped, and overwriting it in place would change pages under them.
+    A failed dump removes its temporary file and leaves `path` untouched.
+    """
+    tmp = '%s.tmp-%d' % (path, os.getpid())
+    try:
+        joblib.dump(obj, tmp, compress=0)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load(path):
+    """Load a saved CompiledForest with its node arrays memory-mapped read-only.
+
+    Nothing is unpickled into private memory: every gunicorn worker maps the same
+    file and shares its pages through the OS page cache.
+    """
+    return joblib.load(path, mmap_mode='r')
@@ -14,6 +14,7 @@ warnings.filterwarnings("ignore")
 import matplotlib.pyplot as plt
 from itertools import product
 import seaborn as sns
+import correlation
 
 
 # In[3]:
@@ -90,13 +91,12 @@ discrete_features = X.dtypes == int
 # In[13]:
 
 
-from sklearn.feature_selection import mutual_info_regression
+# binned classification MI over all columns at once (see feature_scoring.py), instead of
+# kNN mutual_info_regression per column; fast enough for every row
+from feature_scoring import mi_scores as binned_mi_scores
 
 def make_mi_scores(X, y, discrete_features):
-    mi_scores = mutual_info_regression(X, y, discrete_features=discrete_features)
-    mi_scores = pd.Series(mi_scores, name="MI Scores", index=X.columns)
-    mi_scores = mi_scores.sort_values(ascending=False)
-    return mi_scores
+    return binned_mi_scores(X, y, discrete_features=discrete_features)
 
 mi_scores = make_mi_scores(X, y, discrete_features)
 
@@ -128,8 +128,10 @@ plot_mi_scores(mi_scores)
 
 plt.figure(figsize=(20, 20))
 # define the mask to set the values in the upper triangle to True
-mask = np.triu(np.ones_like(df_preprocessed.corr(), dtype=np.bool))
-heatmap = sns.heatmap(df_preprocessed.corr(), mask=mask, vmin=-1, vmax=1, annot=True, cmap='BrBG')
+# computed once (float32, memoized on the frame's content) for both the mask and the heatmap
+corr = correlation.corr(df_preprocessed)
+mask = np.triu(np.ones_like(corr, dtype=np.bool))
+heatmap = sns.heatmap(corr, mask=mask, vmin=-1, vmax=1, annot=True, cmap='BrBG')
 heatmap.set_title('Triangle Correlation Heatmap', fontdict={'fontsize':18}, pad=40);
 
 
@@ -160,25 +162,27 @@ df_categorical.shape
 # In[21]:
 
 
-from sklearn import preprocessing
-scalar=preprocessing.StandardScaler()
-df_numerical_std_1=scalar.fit_transform(df_numerical)
+# scaler and PCA are fitted in batches of PCA_BATCH rows (reduction.py), so the standardised
+# copy of the numeric columns is never held whole
+import reduction
+PCA_BATCH = 50000
+numeric_chunks = lambda: reduction.frame_chunks(df_numerical, PCA_BATCH)
+scalar = reduction.fit_scaler(numeric_chunks())
 
 
 # In[26]:
 
 
-df_numerical_std_2=pd.DataFrame(df_numerical_std_1, columns = ['Age','AppliedAmount','Interest','LoanDuration','IncomeTotal','LiabilitiesTotal','AmountOfPreviousLoansBeforeLoan'])
+# first rows of the standardised columns
+df_numerical_std_2=pd.DataFrame(scalar.transform(df_numerical.head()), columns = ['Age','AppliedAmount','Interest','LoanDuration','IncomeTotal','LiabilitiesTotal','AmountOfPreviousLoansBeforeLoan'])
 
 
 # In[21]:
 
 
-from sklearn.decomposition import PCA
-
 # Create principal components
-pca = PCA(n_components=5)
-X_pca = pca.fit_transform(df_numerical_std_1)
+pca = reduction.fit_pca(scalar, numeric_chunks(), n_components=5)
+X_pca = reduction.transform(scalar, pca, numeric_chunks())
 
 # Convert to dataframe
 component_names = [f"PC{i+1}" for i in range(X_pca.shape[1])]
@@ -223,8 +227,12 @@ aftr_pca.dtypes
 
 from sklearn.ensemble import ExtraTreesClassifier
 import matplotlib.pyplot as plt
-model=ExtraTreesClassifier()
-model.fit(X,y)
+# cores and BLAS threads from TRAIN_N_JOBS / TRAIN_BLAS_THREADS (default: every core)
+from parallel import ParallelPolicy
+policy = ParallelPolicy.from_env()
+model=policy.configure(ExtraTreesClassifier())
+with policy.stage('fit extra trees'):
+    model.fit(X,y)
 print(model.feature_importances_)
 
 
@@ -240,8 +248,10 @@ feat_import.nlargest(10).plot(kind='barh')
 
 plt.figure(figsize=(20, 20))
 # define the mask to set the values in the upper triangle to True
-mask = np.triu(np.ones_like(aftr_pca.corr(), dtype=np.bool))
-heatmap = sns.heatmap(aftr_pca.corr(), mask=mask, vmin=-1, vmax=1, annot=False, cmap='BrBG')
+# computed once (float32, memoized on the frame's content) for both the mask and the heatmap
+corr = correlation.corr(aftr_pca)
+mask = np.triu(np.ones_like(corr, dtype=np.bool))
+heatmap = sns.heatmap(corr, mask=mask, vmin=-1, vmax=1, annot=False, cmap='BrBG')
 heatmap.set_title('Triangle Correlation Heatmap', fontdict={'fontsize':18}, pad=40);
 
 
@@ -269,7 +279,7 @@ aftr_pca.head()
 plt.figure(figsize=(20, 16))
 # Store heatmap object in a variable to easily access it when you want to include more features (such as title).
 # Set the range of values to be displayed on the colormap from -1 to 1, and set the annotation to True to display the correlation values on the heatmap.
-heatmap = sns.heatmap(aftr_pca.corr(), vmin=-1, vmax=1, annot=True)
+heatmap = sns.heatmap(correlation.corr(aftr_pca), vmin=-1, vmax=1, annot=True)
 # Give a title to the heatmap. Pad defines the distance of the title from the top of the heatmap.
 heatmap.set_title('Correlation Heatmap', fontdict={'fontsize':12}, pad=12);
 
@@ -293,9 +303,19 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size = 0.20, rand
 
 
 from sklearn.ensemble import RandomForestClassifier  
-random_classifier= RandomForestClassifier(bootstrap = True, max_depth = 20, max_features = 4, n_estimators = 200)  
-clf = random_classifier.fit(X_train,y_train)
+# MODEL_BACKEND=hist_gb fits histogram gradient boosting instead, label codes as categorical features
+import os
+import backends
+from pipeline import ENCODED
+BACKEND = os.environ.get('MODEL_BACKEND', 'forest')
+if BACKEND == 'forest':
+    random_classifier= policy.configure(backends.make('forest', max_depth = 20, max_features = 4))
+else:
+    random_classifier = backends.make(BACKEND, categorical_features=[X.columns.get_loc(col) for col in ENCODED])
+with policy.stage('fit %s' % BACKEND, workers=None if BACKEND == 'forest' else 1):
+    clf = random_classifier.fit(X_train,y_train)
 random_pred = clf.predict(X_test)
+policy.report()
 
 
 # In[63]:
@@ -307,5 +327,22 @@ aftr_pca.to_csv("credit_pipeline_1.csv")
 # In[ ]:
 
 
+# same table as uint8 label codes + float32 amounts, a quarter of the float64/int64 frame
+from dataset import CompactDataset
+CompactDataset.from_frame(aftr_pca, target='Status').save('credit_pipeline_1.data')
+
+
+# In[ ]:
+
+
+# the imputation means and label encodings above, fitted once and saved for serving;
+# model_pipeline_ashish_1.py adds the trained forest to make the credit_pipeline artifact
+from pipeline import CreditPipeline
+CreditPipeline().fit(df_preprocessed).save('credit_transforms')
+
+
+# In[ ]:
+
+
 
 
@@ -12,90 +12,144 @@ from sklearn.ensemble import RandomForestClassifier
 # In[2]:
 
 
-df_model=pd.read_csv('credit_pipeline_1.csv',low_memory=False,index_col=0)
+# uint8 label codes + float32 amounts, widened once to the float32 Fortran-ordered X the
+# tree builder uses as is (see dataset.py)
+import os
+import dataset
+def build_features():
+    if os.path.exists('credit_pipeline_1.data'):
+        # written next to the CSV by model_RF_concat.py
+        return dataset.load('credit_pipeline_1.data').arrays()
+    return dataset.CompactDataset.read_csv('credit_pipeline_1.csv', target='Status').arrays()
 
 
 # In[3]:
 
 
-df_model.head()
+# float32 X, y and CV fold ids come memory-mapped from .cache/features when credit_pipeline_1.csv
+# has not changed; build_features() only runs on the first run after a change
+from feature_cache import cached_features, split
+X, y, folds = cached_features('credit_pipeline_1.csv', {'target': 'Status', 'dropped': ['index'], 'layout': 'F'}, build_features)
 
 
-# In[4]:
+# In[7]:
 
 
-df_model.reset_index(inplace=True)
+from sklearn.model_selection import train_test_split
+train_rows, test_rows = train_test_split(np.arange(len(y)), test_size = 0.20, random_state = 0)
+X_train, X_test = dataset.take(X, train_rows), dataset.take(X, test_rows)
+y_train, y_test = y[train_rows], y[test_rows]
 
 
-# In[5]:
+# In[22]:
 
 
-df_model.drop(['index'],axis=1,inplace=True)
+X.shape, X.dtype
 
 
-# In[6]:
+# In[23]:
 
 
-df_model
+# cores and BLAS threads from TRAIN_N_JOBS / TRAIN_BLAS_THREADS (default: every core)
+from parallel import ParallelPolicy
+policy = ParallelPolicy.from_env()
+# MODEL_BACKEND=hist_gb trains a histogram gradient-boosting model on the same features instead
+import backends
+BACKEND = os.environ.get('MODEL_BACKEND', 'forest')
+MODEL_FILE = 'rf_jlib' if BACKEND == 'forest' else BACKEND + '_jlib'
+# the forest's hyperparameters live in backends.FOREST_PARAMS
+model = policy.configure(backends.make(BACKEND))
 
 
-# In[7]:
+# In[10]:
 
 
-X = df_model.drop(['Status'],axis=1)
-y = df_model["Status"]
-from sklearn.model_selection import train_test_split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size = 0.20, random_state = 0)
+# hist_gb has no n_jobs; it runs OpenMP threads in one worker, so give them every core
+with policy.stage('fit %s' % BACKEND, workers=None if BACKEND == 'forest' else 1):
+    model.fit(X_train,y_train)
 
 
-# In[22]:
+# In[12]:
 
 
-X.info()
+with policy.stage('predict'):
+    pred=model.predict(X_test)
 
 
-# In[23]:
+# In[13]:
 
 
-rf = RandomForestClassifier(bootstrap=True, max_depth=10, max_features= 'auto',min_samples_leaf=1,min_samples_split=2,n_estimators=200)
+from sklearn.metrics import classification_report
+class_report_RF=classification_report(y_test, pred)
 
 
-# In[10]:
+# In[14]:
 
 
-rf.fit(X_train,y_train)
+print(class_report_RF)
 
 
-# In[12]:
+# In[ ]:
 
 
-pred=rf.predict(X_test)
+# cross-validated accuracy on the cached folds
+from sklearn.model_selection import cross_val_score
+with policy.stage('cross-validation'):
+    cv_scores = cross_val_score(model, X, y, cv=split(folds), scoring='accuracy')
+cv_scores
 
 
-# In[13]:
+# In[ ]:
 
 
-from sklearn.metrics import classification_report
-class_report_RF=classification_report(y_test, pred)
+policy.report()
 
 
-# In[14]:
+# In[ ]:
 
 
-print(class_report_RF)
+# data window of every tree; retrain.py appends trees for new monthly exports next to these
+if BACKEND == 'forest':
+    model.tree_windows_ = ['credit_pipeline_1.csv'] * model.n_estimators
 
 
 # In[15]:
 
 
 import joblib
-joblib.dump(rf, 'rf_jlib')
+joblib.dump(model, MODEL_FILE)
+
+
+# In[ ]:
+
+
+# flat node arrays that app.py memory-maps instead of unpickling the forest in every worker
+if BACKEND == 'forest':
+    from forest_engine import CompiledForest
+    CompiledForest.from_estimator(model).save('rf_engine')
+
+
+# In[ ]:
+
+
+# training transforms from model_RF_concat.py + this model (forests compiled): the artifact app.py serves
+import pipeline
+credit_pipeline = pipeline.load('credit_transforms')
+credit_pipeline.model = backends.for_serving(model)
+credit_pipeline.save('credit_pipeline')
+
+
+# In[ ]:
+
+
+# fit time is in policy.report(); artifact size and scoring latency for comparing backends
+backends.benchmark(credit_pipeline.model, X_test, 'credit_pipeline')
 
 
 # In[16]:
 
 
-pipe = joblib.load("rf_jlib")
+pipe = joblib.load(MODEL_FILE)
 
 
 # In[20]:
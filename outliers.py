@@ -0,0 +1,90 @@
+"""IQR outlier filtering for several columns at once.
+
+    fences = iqr_fences(df, ['MonthlyPayment', 'IncomeTotal'], k=1.5)
+    df = iqr_filter(df, fences)
+
+All quartiles come from a single DataFrame.quantile call and the per-column
+masks are combined before one boolean filter, instead of a quantile/mask/drop
+round per column. For exports too large to sort in memory, StreamingQuantiles
+estimates the quartiles from a fixed-size uniform reservoir sample built chunk
+by chunk, and iqr_mask is then applied to each chunk on a second pass.
+Rows with a missing value are never treated as outliers.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _multipliers(columns, k):
+    # k is either one multiplier for every column or a {column: multiplier} dict
+    if isinstance(k, dict):
+        return np.array([k[col] for col in columns], dtype=np.float64)
+    return np.full(len(columns), k, dtype=np.float64)
+
+
+def iqr_fences(df, columns, k=1.5):
+    """Lower/upper fences (Q1 - k*IQR, Q3 + k*IQR) per column, as a 2-row DataFrame."""
+    q = df[columns].quantile([0.25, 0.75]).to_numpy()
+    return _fences(columns, q[0], q[1], k)
+
+
+def _fences(columns, q1, q3, k):
+    iqr = q3 - q1
+    k = _multipliers(columns, k)
+    return pd.DataFrame([q1 - k * iqr, q3 + k * iqr], index=['lower', 'upper'], columns=columns)
+
+
+def iqr_mask(df, fences):
+    """True for rows that lie inside the fences on every fenced column."""
+    values = df[list(fences.columns)].to_numpy(dtype=np.float64)
+    outside = (values < fences.loc['lower'].to_numpy()) | (values > fences.loc['upper'].to_numpy())
+    return ~outside.any(axis=1)
+
+
+def iqr_filter(df, fences):
+    return df[iqr_mask(df, fences)]
+
+
+class StreamingQuantiles:
+    """Approximate per-column quartiles from a uniform reservoir sample of every chunk seen."""
+
+    def __init__(self, columns, sample_size=100000, seed=0):
+        self.columns = list(columns)
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._sample = {col: np.empty(sample_size) for col in self.columns}
+        self._seen = dict.fromkeys(self.columns, 0)
+
+    def update(self, chunk):
+        for col in self.columns:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            self._add(col, values[~np.isnan(values)])
+        return self
+
+    def _add(self, col, values):
+        sample, seen = self._sample[col], self._seen[col]
+        fill = max(0, min(self.sample_size - seen, len(values)))
+        sample[seen:seen + fill] = values[:fill]
+        rest = values[fill:]
+        if len(rest):
+            # algorithm R, vectorised: the i-th value overall replaces slot randint(0, i)
+            # when that slot exists; later values win, as in the sequential version
+            slots = self._rng.integers(0, seen + fill + np.arange(1, len(rest) + 1))
+            keep = slots < self.sample_size
+            sample[slots[keep]] = rest[keep]
+        self._seen[col] = seen + len(values)
+
+    def quantiles(self, q):
+        return pd.DataFrame({col: np.quantile(self._sample[col][:min(self._seen[col], self.sample_size)], q)
+                             for col in self.columns}, index=q)
+
+    def fences(self, k=1.5):
+        q = self.quantiles([0.25, 0.75]).to_numpy()
+        return _fences(self.columns, q[0], q[1], k)
+
+
+def streaming_iqr_fences(chunks, columns, k=1.5, sample_size=100000, seed=0):
+    """Fences estimated from an iterable of DataFrame chunks (e.g. read_csv(chunksize=...))."""
+    estimator = StreamingQuantiles(columns, sample_size=sample_size, seed=seed)
+    for chunk in chunks:
+        estimator.update(chunk)
+    return estimator.fences(k)
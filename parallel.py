@@ -0,0 +1,100 @@
+"""How many cores the training scripts use, and how well they use them.
+
+    policy = ParallelPolicy.from_env()        # TRAIN_N_JOBS, TRAIN_BLAS_THREADS, TRAIN_BACKEND
+    rf = policy.configure(RandomForestClassifier(n_estimators=200))
+    with policy.stage('random forest'):
+        rf.fit(X_train, y_train)
+    policy.report()
+
+n_jobs goes to every estimator the policy configures (and to joblib through
+parallel_backend when a backend is named). Inside a stage, BLAS/OpenMP pools
+are capped with threadpoolctl at cores // workers threads, so n_jobs workers
+each running a multi-threaded BLAS call do not oversubscribe the machine,
+while single-worker stages (PCA, scaling) still get every core for BLAS.
+
+Each stage records wall time and CPU time, and cores_busy = cpu / wall: how
+many cores this process kept busy on average. That is utilisation, not a
+speedup over a serial run. CPU time is that of this process, so it covers
+thread-based work (forest fitting and prediction) but not loky worker
+processes (GridSearchCV, successive_halving, cross_val_score with n_jobs);
+stages run with processes=True record wall time only.
+"""
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from joblib import cpu_count, effective_n_jobs, parallel_backend
+from threadpoolctl import threadpool_limits
+
+
+class ParallelPolicy:
+
+    def __init__(self, n_jobs=-1, blas_threads=None, backend=None, verbose=True):
+        self.n_jobs = n_jobs
+        self.blas_threads = blas_threads
+        self.backend = backend
+        self.verbose = verbose
+        self.timings = []
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        blas_threads = os.environ.get('TRAIN_BLAS_THREADS')
+        return cls(n_jobs=int(os.environ.get('TRAIN_N_JOBS', -1)),
+                   blas_threads=int(blas_threads) if blas_threads else None,
+                   backend=os.environ.get('TRAIN_BACKEND') or None, **kwargs)
+
+    @property
+    def workers(self):
+        return effective_n_jobs(self.n_jobs)
+
+    @property
+    def threads_per_worker(self):
+        if self.blas_threads:
+            return self.blas_threads
+        return max(1, cpu_count() // self.workers)
+
+    def configure(self, estimator, n_jobs=None):
+        """Set n_jobs on the estimator and on every nested estimator that has one."""
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        names = [name for name in estimator.get_params() if name == 'n_jobs' or name.endswith('__n_jobs')]
+        return estimator.set_params(**dict.fromkeys(names, n_jobs))
+
+    @contextmanager
+    def stage(self, name, workers=None, processes=False):
+        """Run a block under the policy's thread limits and record its timings.
+
+        workers: how many parallel workers the block runs (default: the policy's);
+        BLAS gets cores // workers threads. processes: the work runs in joblib worker
+        processes, whose CPU time is not visible here, so none is reported.
+        """
+        processes = processes and self.backend != 'threading'
+        threads = self.threads_per_worker if workers is None else max(1, cpu_count() // workers)
+        backend = parallel_backend(self.backend, n_jobs=self.n_jobs) if self.backend else nullcontext()
+        with backend, threadpool_limits(limits=threads):
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                yield
+            finally:
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                if processes:
+                    cpu = None
+                entry = {'stage': name, 'wall': wall, 'cpu': cpu,
+                         'cores_busy': None if cpu is None else cpu / wall if wall else 0.0,
+                         'workers': self.workers if workers is None else workers, 'blas_threads': threads}
+                self.timings.append(entry)
+                if self.verbose:
+                    print(_line(entry))
+
+    def report(self):
+        for entry in self.timings:
+            print(_line(entry))
+        return self.timings
+
+
+def _line(entry):
+    if entry['cpu'] is None:
+        usage = "cpu in worker processes not measured"
+    else:
+        usage = "%(cpu).2fs cpu, %(cores_busy).1f cores busy" % entry
+    return ("%s: %.2fs wall, %s (%d workers, %d BLAS threads)"
+            % (entry['stage'], entry['wall'], usage, entry['workers'], entry['blas_threads']))
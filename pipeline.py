@@ -0,0 +1,189 @@
+"""Training-time preprocessing and the fitted model as one serving artifact.
+
+model_RF_concat.py prepares the model input by mean-imputing VerificationType
+and Gender, label-encoding the categorical columns one by one and (for the PCA
+variant) standardising and projecting the numeric columns. CreditPipeline
+fits exactly those steps, keeps only the fitted arrays and lookup tables, and
+holds the model, so app.py can turn a raw application into the model's input
+row with the training transforms.
+
+    pipe = CreditPipeline().fit(df_preprocessed)     # model_RF_concat.py
+    pipe.model = rf                                  # model_pipeline_ashish_1.py
+    pipe.save('credit_pipeline')
+"""
+import joblib
+import numpy as np
+
+import codes
+import forest_engine
+import scoring
+
+
+# label-encoded in model_RF_concat.py (LabelEncoder fitted per column)
+ENCODED = ['NewCreditCustomer', 'LanguageCode', 'Education', 'MaritalStatus', 'EmploymentStatus',
+           'EmploymentDurationCurrentEmployer', 'OccupationArea', 'Restructured', 'CreditScoreEsMicroL']
+
+# mean-imputed, then used as numbers
+IMPUTED = ['VerificationType', 'Gender']
+
+NUMERIC = ['Age', 'AppliedAmount', 'Interest', 'LoanDuration', 'IncomeTotal', 'LiabilitiesTotal',
+           'AmountOfPreviousLoansBeforeLoan']
+
+
+def _key(value):
+    """Canonical lookup key, so 3, 3.0, '3', True and 'TRUE' find the same category."""
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            return value.lower()
+    if isinstance(value, (bool, np.bool_)):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float, np.number)):
+        value = float(value)
+        return '%d' % value if value.is_integer() else repr(value)
+    return str(value).lower()
+
+
+def _column(data, col):
+    # data is a DataFrame or a list of dict-like records
+    if hasattr(data, 'columns'):
+        return data[col].tolist()
+    return [record[col] for record in data]
+
+
+class CreditPipeline:
+
+    def __init__(self, model=None, n_components=None, batch_size=50000):
+        self.model = model
+        self.n_components = n_components
+        self.batch_size = batch_size
+        self.lookup_ = None
+        self.components_ = None
+
+    def fit(self, df):
+        from sklearn.preprocessing import LabelEncoder
+
+        self.impute_ = {col: float(df[col].mean()) for col in IMPUTED}
+        self.classes_by_column_ = {col: LabelEncoder().fit(df[col]).classes_ for col in ENCODED}
+        self.lookup_, self.fallback_ = {}, {}
+        for col, classes in self.classes_by_column_.items():
+            lookup = {_key(value): i for i, value in enumerate(classes)}
+            fallback = -1
+            if col in codes.TABLES:
+                # Bondora_EDA.py decodes these columns to labels, while Bondora_preprocessed.py
+                # keeps the numeric codes and only recodes -1/0 to Not_present/Not_specified
+                # ('4.0' and 'Not_present' once read back from the CSV): whichever the training
+                # frame holds, the other spelling is aliased to it so serving accepts both
+                table = codes.TABLES[col]
+                for code, label in table.labels.items():
+                    code, label = _key(code), _key(label)
+                    if label in lookup:
+                        lookup.setdefault(code, lookup[label])
+                    elif code in lookup:
+                        lookup.setdefault(label, lookup[code])
+                fallback = lookup.get(_key(table.default), -1)
+            elif set(lookup) <= {'true', 'false'}:
+                for alias, value in (('1', 'true'), ('0', 'false')):
+                    if value in lookup:
+                        lookup[alias] = lookup[value]
+            self.lookup_[col] = lookup
+            self.fallback_[col] = fallback
+
+        self.scale_mean_ = self.scale_ = self.components_ = self.pca_mean_ = None
+        if self.n_components:
+            # scaler and incremental PCA fitted batch_size rows at a time (reduction.py)
+            import reduction
+            scaler, pca = reduction.fit(lambda: reduction.frame_chunks(df[NUMERIC], self.batch_size),
+                                        self.n_components)
+            self.set_reduction(scaler.mean_, scaler.scale_, pca)
+        self.plan_ = self._plan()
+        # accepted codes and training ranges of every field, for request validation (schema.py)
+        import schema
+        self.schema_ = schema.FeatureSchema.from_frame(df, self)
+        return self
+
+    def set_reduction(self, mean, scale, pca):
+        """Use a fitted scaler (mean/scale) and PCA or IncrementalPCA for the numeric block."""
+        self.scale_mean_, self.scale_ = mean, scale
+        self.components_, self.pca_mean_ = pca.components_, pca.mean_
+        self.n_components = len(self.components_)
+        if self.lookup_ is not None:
+            self.plan_ = self._plan()
+
+    @property
+    def columns_(self):
+        # FEATURES ends with the NUMERIC block, which PCA replaces with PC1..PCk
+        categorical = [col for col in scoring.FEATURES if col not in NUMERIC]
+        if self.components_ is not None:
+            return categorical + ['PC%d' % (i + 1) for i in range(len(self.components_))]
+        return list(scoring.FEATURES)
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def _plan(self):
+        columns = self.columns_
+        encode = [(columns.index(col), col, lookup, self.fallback_[col])
+                  for col, lookup in self.lookup_.items()]
+        impute = [(columns.index(col), col, mean) for col, mean in self.impute_.items()]
+        return encode, impute, len(scoring.FEATURES) - len(NUMERIC)
+
+    def transform_batch(self, data):
+        """Model input matrix (float32, C order) for a DataFrame or a list of records."""
+        if self.lookup_ is None:
+            # bare model artifact without fitted transforms: records are already model input
+            return scoring.records_to_matrix(data if isinstance(data, list) else data.to_dict('records'))
+        encode, impute, numeric_start = self.plan_
+        out = np.empty((len(data), len(self.columns_)), dtype=np.float32)
+        for j, col, lookup, fallback in encode:
+            out[:, j] = [lookup.get(_key(v), fallback) for v in _column(data, col)]
+        for j, col, mean in impute:
+            values = np.array([np.nan if v is None or v == '' else v for v in _column(data, col)],
+                              dtype=np.float64)
+            out[:, j] = np.where(np.isnan(values), mean, values)
+        numeric = np.array([_column(data, col) for col in NUMERIC], dtype=np.float64).T
+        out[:, numeric_start:] = self._reduce(numeric)
+        return out
+
+    def transform_one(self, record, out=None):
+        """Single-record transform_batch writing straight into `out` (allocated if not given)."""
+        if self.lookup_ is None:
+            row = scoring.records_to_matrix([record])[0]
+            if out is None:
+                return row
+            out[:] = row
+            return out
+        encode, impute, numeric_start = self.plan_
+        if out is None:
+            out = np.empty(len(self.columns_), dtype=np.float32)
+        for j, col, lookup, fallback in encode:
+            out[j] = lookup.get(_key(record[col]), fallback)
+        for j, col, mean in impute:
+            value = record[col]
+            value = mean if value is None or value == '' else float(value)
+            out[j] = mean if value != value else value
+        if self.components_ is None:
+            for j, col in enumerate(NUMERIC, numeric_start):
+                out[j] = float(record[col])
+        else:
+            out[numeric_start:] = self._reduce(np.array([float(record[col]) for col in NUMERIC]))
+        return out
+
+    def _reduce(self, numeric):
+        if self.components_ is None:
+            return numeric
+        return ((numeric - self.scale_mean_) / self.scale_ - self.pca_mean_) @ self.components_.T
+
+    def predict_proba(self, data):
+        return self.model.predict_proba(self.transform_batch(data))
+
+    def save(self, path):
+        # a compiled forest's node arrays stay memory-mappable (see forest_engine.dump)
+        forest_engine.dump(self, path)
+
+
+def load(path):
+    return joblib.load(path, mmap_mode='r')
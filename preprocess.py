@@ -0,0 +1,59 @@
+"""Bondora_preprocessed.py as a chunked, constant-memory job.
+
+    python preprocess.py Bondora_raw.csv Bondora_preprocessed.csv --chunksize 100000
+
+Every step of the notebook works row by row (column drops, DefaultLoan from
+DefaultDate, the -1/0 recodes), so the raw export can be read and written in
+fixed-size chunks and peak memory depends on the chunk size only.
+"""
+import argparse
+
+import pandas as pd
+
+from ingest import MISS_COL, PREPROCESSED_COLS_DEL, raw_dtypes, surviving_columns
+
+
+OBJECT_COLUMNS = ['VerificationType', 'Gender', 'LanguageCode', 'UseOfLoan', 'Education',
+                  'MaritalStatus', 'EmploymentStatus', 'NewCreditCustomer', 'Restructured',
+                  'OccupationArea', 'HomeOwnershipType']
+
+# (column, mis-entered codes, replacement)
+RECODES = [('UseOfLoan', [-1], 'Not set'),
+           ('Education', [-1, 0], 'Not_present'),
+           ('MaritalStatus', [-1, 0], 'Not_specified'),
+           ('EmploymentStatus', [-1], 'Not_specified'),
+           ('OccupationArea', [-1], 'Not_specified'),
+           ('HomeOwnershipType', [-1], 'Not_specified')]
+
+
+def preprocess_chunk(loan):
+    """Apply the Bondora_preprocessed.py transformations to a frame of raw rows."""
+    loan = loan.drop(MISS_COL + PREPROCESSED_COLS_DEL, axis=1, errors='ignore')
+    loan['DefaultLoan'] = loan['DefaultDate'].notnull().astype(float)
+    loan = loan.drop(['Status', 'DefaultDate'], axis=1)
+    for col in OBJECT_COLUMNS:
+        loan[col] = loan[col].astype('object')
+    for col, codes, label in RECODES:
+        loan.loc[loan[col].isin(codes), col] = label
+    return loan
+
+
+def preprocess_csv(src='Bondora_raw.csv', dst='Bondora_preprocessed.csv', chunksize=100000):
+    """Stream src through preprocess_chunk into dst; returns the number of rows written."""
+    usecols = surviving_columns(src, MISS_COL + PREPROCESSED_COLS_DEL)
+    reader = pd.read_csv(src, usecols=usecols, dtype=raw_dtypes(usecols), chunksize=chunksize)
+    rows = 0
+    with open(dst, 'w', newline='') as out:
+        for chunk in reader:
+            preprocess_chunk(chunk).to_csv(out, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('src', nargs='?', default='Bondora_raw.csv')
+    parser.add_argument('dst', nargs='?', default='Bondora_preprocessed.csv')
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+    print(preprocess_csv(args.src, args.dst, args.chunksize), 'rows written to', args.dst)
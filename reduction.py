@@ -0,0 +1,80 @@
+"""StandardScaler + PCA of the numeric columns, fitted batch by batch.
+
+    scaler, pca = reduction.fit(lambda: reduction.csv_chunks('Bondora_preprocessed.csv', NUMERIC),
+                                n_components=5)
+    credit_pipeline.set_reduction(scaler.mean_, scaler.scale_, pca)    # served by app.py
+
+The notebooks standardise the whole numeric block and fit PCA on the result,
+holding the raw and the standardised matrix at once. Here the scaler's
+mean/variance are accumulated with StandardScaler.partial_fit on a first pass
+and IncrementalPCA.partial_fit consumes standardised batches on a second, so
+memory is bounded by the batch size. The fitted pair plugs into
+CreditPipeline.set_reduction like the in-memory one.
+"""
+import numpy as np
+
+
+def frame_chunks(df, size):
+    """Consecutive row slices of an in-memory frame."""
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def csv_chunks(path, columns, chunksize=50000):
+    import pandas as pd
+    return pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def _values(chunk, columns):
+    if columns is not None and hasattr(chunk, 'columns'):
+        chunk = chunk[columns]
+    return np.asarray(chunk, dtype=np.float64)
+
+
+def _batches(chunks, columns, minimum):
+    # IncrementalPCA needs at least n_components rows per partial_fit: short chunks are
+    # merged forward, and a short tail is merged into the last batch
+    held, held_rows, ready = [], 0, None
+    for chunk in chunks:
+        values = _values(chunk, columns)
+        held.append(values)
+        held_rows += len(values)
+        if held_rows >= minimum:
+            if ready is not None:
+                yield ready
+            ready = np.concatenate(held)
+            held, held_rows = [], 0
+    if held:
+        ready = np.concatenate(([] if ready is None else [ready]) + held)
+    if ready is not None:
+        yield ready
+
+
+def fit_scaler(chunks, columns=None):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for chunk in chunks:
+        scaler.partial_fit(_values(chunk, columns))
+    return scaler
+
+
+def fit_pca(scaler, chunks, n_components, columns=None):
+    from sklearn.decomposition import IncrementalPCA
+
+    pca = IncrementalPCA(n_components=n_components)
+    for batch in _batches(chunks, columns, n_components):
+        pca.partial_fit(scaler.transform(batch))
+    return pca
+
+
+def fit(chunks, n_components, columns=None):
+    """(scaler, pca) from two passes over chunks(), a callable returning a fresh iterable."""
+    scaler = fit_scaler(chunks(), columns)
+    return scaler, fit_pca(scaler, chunks(), n_components, columns)
+
+
+def transform(scaler, pca, chunks, columns=None):
+    """Principal components of every row, computed one chunk at a time."""
+    parts = [pca.transform(scaler.transform(_values(chunk, columns))) for chunk in chunks]
+    return np.concatenate(parts) if parts else np.empty((0, pca.n_components_))
@@ -0,0 +1,119 @@
+"""Hot reload of the served model.
+
+    registry = ModelRegistry(artifact_path, load, poll_interval=10, on_swap=...)
+    served = registry.get()          # once per request
+    row, error, warning = served.validator.validate_one(form)
+    served.batcher.score(row), served.version
+
+A background thread polls the artifact's version (file name, size and
+mtime). When it changes, the new artifact is loaded and warmed with
+synthetic predictions on the watcher thread, checked to give probabilities,
+and only then swapped in with a single reference assignment. Requests hold
+the ServedModel they started with, so in-flight requests finish on the old
+model (and its batcher) while new ones get the new one. A candidate that
+fails to load or warm is dropped and the current model keeps serving.
+"""
+import os
+import threading
+import time
+import traceback
+
+import numpy as np
+
+import schema
+import scoring
+from batching import MicroBatcher
+from score_cache import model_version
+
+
+class ServedModel:
+    """A loaded pipeline with its request validator and micro-batcher, tagged with its version."""
+
+    def __init__(self, version, pipe, max_rows=8, max_wait=0.002, range_margin=None):
+        self.version = version
+        self.pipe = pipe
+        self.validator = schema.compile(pipe, range_margin)
+        self.batcher = MicroBatcher(lambda X: scoring.default_probability(pipe.model, X),
+                                    max_rows=max_rows, max_wait=max_wait)
+
+    def warm(self, n_rows=256, seed=0):
+        """Score synthetic rows (batched and one by one) to fault in the model's pages."""
+        X = np.random.default_rng(seed).normal(scale=100, size=(n_rows, self.pipe.model.n_features_in_))
+        X = X.astype(np.float32)
+        proba = scoring.default_probability(self.pipe.model, X)
+        proba = np.append(proba, [self.batcher.score(row) for row in X[:8]])
+        if not (np.all(proba >= 0) and np.all(proba <= 1)):
+            raise ValueError("model %s gives probabilities outside [0, 1]" % self.version)
+        return self
+
+    def close(self):
+        self.batcher.close()
+
+
+class ModelRegistry:
+
+    def __init__(self, resolve, load, poll_interval=10.0, on_swap=None):
+        """resolve() -> current artifact path; load(path, version) -> ServedModel."""
+        self.resolve = resolve
+        self.load = load
+        self.poll_interval = poll_interval
+        self.on_swap = on_swap
+        path = resolve()
+        self._current = load(path, model_version(path))
+        self._reset()
+        # gunicorn --preload forks after import; each worker starts its own watcher
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._failed = None
+
+    def get(self):
+        if self._thread is None and self.poll_interval:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+                    self._thread.start()
+        return self._current
+
+    @property
+    def version(self):
+        return self._current.version
+
+    def refresh(self):
+        """Load, warm and swap in the artifact if its version changed; True if swapped."""
+        with self._lock:
+            path = self.resolve()
+            try:
+                version = model_version(path)
+            except OSError:
+                return False
+            if version in (self._current.version, self._failed):
+                return False
+            try:
+                candidate = self.load(path, version)
+                try:
+                    candidate.warm()
+                except Exception:
+                    # stop its batching thread, which would otherwise keep it alive
+                    candidate.close()
+                    raise
+            except Exception:
+                # not retried until the file changes again
+                self._failed = version
+                raise
+            previous, self._current = self._current, candidate
+        if self.on_swap is not None:
+            self.on_swap(candidate)
+        previous.close()
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh()
+            except Exception:
+                # half-written or broken artifact: keep serving the current model, retry next poll
+                traceback.print_exc()
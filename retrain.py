@@ -0,0 +1,125 @@
+"""Incremental retraining of the rf_jlib forest on a new monthly export.
+
+    python retrain.py credit_pipeline_2026_09.csv --window 2026-09 --trees 20 --max-trees 400
+
+Instead of refitting RandomForestClassifier on the whole history, a small
+forest with the same hyper-parameters is fitted on the new slice only and its
+trees are appended to the existing ensemble; with max_trees the oldest trees
+are retired so the ensemble keeps a fixed size and drifts towards recent
+loans. Every tree's data window is kept in forest.tree_windows_ (parallel to
+estimators_), so retraining cost depends on the size of the new slice only.
+
+The new slice is model input in the credit_pipeline_1.csv layout (FEATURES
+and Status); with --transforms a Bondora_preprocessed.csv style slice is
+encoded by the fitted CreditPipeline from model_RF_concat.py instead.
+"""
+import argparse
+import os
+from collections import Counter
+
+import joblib
+import numpy as np
+
+import scoring
+
+# window of the trees of a forest trained before windows were recorded
+BASE_WINDOW = 'base'
+
+
+def tree_windows(forest):
+    return list(getattr(forest, 'tree_windows_', None) or [BASE_WINDOW] * len(forest.estimators_))
+
+
+def append_trees(forest, X, y, window, n_trees=20, max_trees=None, random_state=None):
+    """Fit n_trees on (X, y) with the forest's parameters and add them to the forest in place.
+
+    With max_trees, the oldest trees beyond that count are dropped afterwards.
+    """
+    from sklearn.base import clone
+
+    if not hasattr(forest, 'estimators_'):
+        raise ValueError("only forests can be extended with trees, got %s" % type(forest).__name__)
+    update = clone(forest).set_params(n_estimators=n_trees, warm_start=False, random_state=random_state)
+    update.fit(X, y)
+    # tree leaf values are indexed by class position, so both forests must know the same classes
+    if not np.array_equal(update.classes_, forest.classes_):
+        raise ValueError("new slice has classes %s, the forest %s" % (update.classes_, forest.classes_))
+    windows = tree_windows(forest) + [window] * n_trees
+    estimators = forest.estimators_ + update.estimators_
+    if max_trees is not None and len(estimators) > max_trees:
+        estimators, windows = estimators[-max_trees:], windows[-max_trees:]
+    forest.estimators_ = estimators
+    forest.tree_windows_ = windows
+    forest.n_estimators = len(estimators)
+    return forest
+
+
+def retire(forest, windows):
+    """Drop every tree trained on one of `windows`, in place."""
+    current, windows = tree_windows(forest), set(windows)
+    keep = [i for i, window in enumerate(current) if window not in windows]
+    if not keep:
+        raise ValueError("retiring %s would leave no trees" % sorted(windows))
+    forest.tree_windows_ = [current[i] for i in keep]
+    forest.estimators_ = [forest.estimators_[i] for i in keep]
+    forest.n_estimators = len(keep)
+    return forest
+
+
+def summary(forest):
+    """Number of trees per data window, oldest first."""
+    return dict(Counter(tree_windows(forest)))
+
+
+def load_slice(path, transforms=None):
+    import pandas as pd
+
+    df = pd.read_csv(path, low_memory=False)
+    if transforms:
+        import pipeline
+        X = pipeline.load(transforms).transform_batch(df)
+    else:
+        X = np.ascontiguousarray(df[scoring.FEATURES].to_numpy(dtype=np.float32))
+    return X, df['Status'].to_numpy()
+
+
+def export(forest, engine_path, pipeline_path):
+    """Refresh the artifacts app.py serves from the updated forest."""
+    import backends
+    import pipeline
+
+    compiled = backends.for_serving(forest)
+    compiled.save(engine_path)
+    if os.path.exists(pipeline_path):
+        credit_pipeline = pipeline.load(pipeline_path)
+        credit_pipeline.model = compiled
+        credit_pipeline.save(pipeline_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('slice', help="CSV of the new loans, with Status")
+    parser.add_argument('--window', required=True, help="label of the slice, e.g. 2026-09")
+    parser.add_argument('--model', default='rf_jlib')
+    parser.add_argument('--trees', type=int, default=20)
+    parser.add_argument('--max-trees', type=int, default=None)
+    parser.add_argument('--transforms', default=None, help="fitted CreditPipeline for raw slices")
+    parser.add_argument('--holdout', type=float, default=0.0,
+                        help="fraction of the slice kept out of training to compare old and new forest")
+    parser.add_argument('--engine', default='rf_engine')
+    parser.add_argument('--pipeline', default='credit_pipeline')
+    args = parser.parse_args()
+
+    forest = joblib.load(args.model)
+    X, y = load_slice(args.slice, args.transforms)
+    X_test = None
+    if args.holdout:
+        from sklearn.model_selection import train_test_split
+        X, X_test, y, y_test = train_test_split(X, y, test_size=args.holdout, random_state=0, stratify=y)
+        before = forest.score(X_test, y_test)
+    append_trees(forest, X, y, args.window, n_trees=args.trees, max_trees=args.max_trees)
+    if X_test is not None:
+        print("holdout accuracy %.4f -> %.4f" % (before, forest.score(X_test, y_test)))
+    joblib.dump(forest, args.model)
+    export(forest, args.engine, args.pipeline)
+    print(summary(forest))
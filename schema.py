@@ -0,0 +1,239 @@
+"""Declarative schema of the scoring request, and the validator compiled from it.
+
+    schema = FeatureSchema.from_frame(df_preprocessed, credit_pipeline)   # done by CreditPipeline.fit
+    validator = compile(credit_pipeline)                                 # once per served model
+    X, valid, errors, warnings = validator.validate(records)             # model input rows
+    row, error, warning = validator.validate_one(request.form)
+
+Every input field is a Feature: a category (its accepted values and the model
+code each maps to, i.e. the fitted label encoding plus the Bondora codes of
+codes.py), or a float with its domain bounds (DOMAINS), the range seen in
+training and an optional imputation value. The validator converts a whole
+batch column by column: codes are looked up, numbers converted with one
+numpy cast, bounds checked with array comparisons, and failing rows are only
+flagged in a mask. A message is built only for the first bad field of each
+rejected row, so bad rows cost nothing extra and nothing raises per field.
+
+Missing, unparsable and non-finite values, unknown codes and values outside
+the domain are rejected. The training frame was outlier-filtered
+(Bondora_EDA.py), so values outside the training range are ordinary
+applicants and only draw a warning, unless the validator is compiled with a
+margin: then the training range widened by margin * span is enforced too.
+"""
+import numpy as np
+
+import scoring
+from pipeline import ENCODED, IMPUTED, NUMERIC, _key
+
+
+_BOOLEAN_CODES = {'true': 1, 'false': 0, '1': 1, '0': 0, 'yes': 1, 'no': 0}
+
+# (min, max) a value can take at all; None leaves that side open
+DOMAINS = {'VerificationType': (0, None), 'Gender': (0, None), 'Age': (0, 120),
+           'AppliedAmount': (0, None), 'Interest': (0, None), 'LoanDuration': (0, None),
+           'IncomeTotal': (0, None), 'LiabilitiesTotal': (0, None),
+           'AmountOfPreviousLoansBeforeLoan': (0, None)}
+
+
+class Feature:
+
+    def __init__(self, name, dtype, codes=None, fallback=None, min=None, max=None, default=None,
+                 train_min=None, train_max=None):
+        self.name = name
+        self.dtype = dtype          # 'category' or 'float'
+        self.codes = codes          # category: canonical value -> model code
+        self.fallback = fallback    # category: code for unlisted numeric Bondora codes
+        self.min = min              # float: domain bounds, always enforced
+        self.max = max
+        self.default = default      # float: value used for a missing field (else it is required)
+        self.train_min = train_min  # float: range of the training frame
+        self.train_max = train_max
+
+    def to_dict(self):
+        return {key: value for key, value in vars(self).items() if value is not None}
+
+
+class FeatureSchema:
+
+    def __init__(self, features):
+        self.features = features
+
+    @classmethod
+    def from_frame(cls, df, pipe):
+        """Codes from the fitted pipeline, training ranges from the training frame."""
+        schema = cls.from_pipeline(pipe)
+        for feature in schema.features:
+            if feature.dtype == 'float' and feature.name in df:
+                feature.train_min, feature.train_max = float(df[feature.name].min()), float(df[feature.name].max())
+        return schema
+
+    @classmethod
+    def from_pipeline(cls, pipe):
+        """Schema without ranges; for bare models, FEATURES are numbers and booleans."""
+        features = []
+        for name in scoring.FEATURES:
+            if pipe is not None and pipe.lookup_ is not None and name in ENCODED:
+                fallback = pipe.fallback_[name]
+                features.append(Feature(name, 'category', dict(pipe.lookup_[name]),
+                                        fallback=fallback if fallback >= 0 else None))
+            elif name in scoring.BOOLEAN_FEATURES:
+                features.append(Feature(name, 'category', dict(_BOOLEAN_CODES)))
+            else:
+                default = None
+                if name in IMPUTED and pipe is not None and pipe.lookup_ is not None:
+                    default = pipe.impute_[name]
+                low, high = DOMAINS.get(name, (None, None))
+                features.append(Feature(name, 'float', min=low, max=high, default=default))
+        return cls(features)
+
+    def to_dict(self):
+        return {'features': [feature.to_dict() for feature in self.features]}
+
+
+def _floats(values):
+    """float64 array of values; missing ('' / None) and unparsable values become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        out = np.empty(len(values))
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (ValueError, TypeError):
+                out[i] = np.nan
+        return out
+
+
+def _missing(value):
+    # None, blank strings and NaN (records taken from a DataFrame)
+    return value is None or value != value or (isinstance(value, str) and not value.strip())
+
+
+def _is_number(key):
+    try:
+        return np.isfinite(float(key))
+    except ValueError:
+        return False
+
+
+def _bound(*values, pick):
+    values = [value for value in values if value is not None]
+    return pick(values) if values else None
+
+
+class Validator:
+
+    def __init__(self, schema, pipe=None, margin=None):
+        """margin: enforce the training range widened by margin * span (default: only warn)."""
+        self.schema = schema
+        self.pipe = pipe
+        self.margin = margin
+        self.numeric_start = len(scoring.FEATURES) - len(NUMERIC)
+        # (min, max) rejected outside of, per feature
+        self.bounds = []
+        for feature in schema.features:
+            low, high = feature.min, feature.max
+            if margin is not None and feature.train_min is not None:
+                pad = margin * (feature.train_max - feature.train_min)
+                low = _bound(low, feature.train_min - pad, pick=max)
+                high = _bound(high, feature.train_max + pad, pick=min)
+            self.bounds.append((low, high))
+
+    def _encode(self, feature, values):
+        codes, fallback = feature.codes, feature.fallback
+        # form and CSV fields are strings from a handful of values: canonicalise each once
+        memo = {}
+        out = np.empty(len(values))
+        for i, value in enumerate(values):
+            if isinstance(value, str) and value in memo:
+                out[i] = memo[value]
+                continue
+            key = _key(value)
+            code = codes.get(key)
+            if code is None and fallback is not None and _is_number(key):
+                # an unlisted Bondora code decodes to the table default, as in training
+                code = fallback
+            out[i] = np.nan if code is None else code
+            if isinstance(value, str):
+                memo[value] = out[i]
+        return out
+
+    def _check(self, feature, bounds, values):
+        """(column, bad mask, reason(value), unfamiliar mask) for one feature over the batch."""
+        present = np.array([not _missing(value) for value in values], dtype=bool)
+        if feature.dtype == 'category':
+            column = self._encode(feature, values)
+            bad = np.isnan(column)
+            return (column, bad, lambda v: 'missing' if _missing(v) else '%r is not an allowed value' % (v,),
+                    np.zeros(len(values), dtype=bool))
+        column = _floats(values)
+        column[~present] = np.nan
+        unparsed = present & np.isnan(column)
+        if feature.default is not None:
+            column[~present] = feature.default
+        bad = np.isnan(column) | np.isinf(column)
+        low, high = bounds
+        unfamiliar = np.zeros(len(values), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            if low is not None:
+                bad |= column < low
+            if high is not None:
+                bad |= column > high
+            if feature.train_min is not None:
+                unfamiliar = present & ((column < feature.train_min) | (column > feature.train_max))
+
+        def reason(v):
+            if _missing(v):
+                return 'missing'
+            try:
+                float(v)
+            except (ValueError, TypeError):
+                return '%r is not a number' % (v,)
+            return '%s outside [%s, %s]' % (v, low, high)
+        return column, bad | unparsed, reason, unfamiliar
+
+    def validate(self, records):
+        """(X, valid, errors, warnings): model input rows, a mask of valid rows, {row: message}
+        for the rest, and {row: message} for valid rows with a value outside the training range.
+
+        Rows of X where valid is False are not meaningful.
+        """
+        n = len(records)
+        typed = np.zeros((n, len(self.schema.features)))
+        valid = np.ones(n, dtype=bool)
+        errors, warnings = {}, {}
+        for j, (feature, bounds) in enumerate(zip(self.schema.features, self.bounds)):
+            values = [record.get(feature.name) for record in records]
+            column, bad, reason, unfamiliar = self._check(feature, bounds, values)
+            for i in np.flatnonzero(bad & valid):
+                errors[int(i)] = '%s: %s' % (feature.name, reason(values[i]))
+            valid &= ~bad
+            for i in np.flatnonzero(unfamiliar & ~bad):
+                warnings.setdefault(int(i), '%s: %s outside the training range [%s, %s]'
+                                    % (feature.name, values[i], feature.train_min, feature.train_max))
+            typed[:, j] = np.where(bad, 0, column)
+        warnings = {i: message for i, message in warnings.items() if valid[i]}
+        return self._model_input(typed), valid, errors, warnings
+
+    def validate_one(self, record):
+        """(row, None, warning or None) for a valid record, (None, message, None) otherwise."""
+        X, valid, errors, warnings = self.validate([record])
+        return (X[0], None, warnings.get(0)) if valid[0] else (None, errors[0], None)
+
+    def _model_input(self, typed):
+        pipe = self.pipe
+        if pipe is None or pipe.components_ is None:
+            return typed.astype(np.float32)
+        out = np.empty((len(typed), len(pipe.columns_)), dtype=np.float32)
+        out[:, :self.numeric_start] = typed[:, :self.numeric_start]
+        out[:, self.numeric_start:] = pipe._reduce(typed[:, self.numeric_start:])
+        return out
+
+
+def compile(pipe, margin=None):
+    """Validator for a pipeline: its fitted schema_, or one derived from its lookups."""
+    schema = getattr(pipe, 'schema_', None)
+    if schema is None or not all(hasattr(feature, 'train_min') for feature in schema.features):
+        # none fitted, or saved when the training range was enforced as the bounds
+        schema = FeatureSchema.from_pipeline(pipe)
+    return Validator(schema, pipe, margin)
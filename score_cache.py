@@ -0,0 +1,162 @@
+"""Cache of default probabilities keyed on the model input row.
+
+Clients re-submit identical applications when they retry or re-quote. After
+the pipeline transform an application is a float32 row, so its bytes are a
+canonical key: '3', 3 and 3.0 in the form all encode to the same row. Keys
+also carry the model version, and invalidate() switches to a new version,
+so a reloaded model never serves the previous model's scores.
+
+Entries live in an in-process LRU with a TTL. An optional shared backend
+(anything with redis-style get(key) / set(key, value, ex=seconds), e.g.
+redis.Redis) lets gunicorn workers and instances share results; LocalShared
+is a dict-backed stand-in with the same interface.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def model_version(path):
+    """Identity of an artifact file: name, size and modification time."""
+    stat = os.stat(path)
+    return '%s-%d-%d' % (os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+
+def row_key(row):
+    # + 0.0 folds -0.0 into 0.0 so both spellings of zero share an entry
+    row = np.ascontiguousarray(row, dtype=np.float32) + np.float32(0)
+    return hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest()
+
+
+class LocalShared:
+    """In-process stand-in for a shared redis-style cache."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires = self._data.get(key, (None, None))
+            if expires is not None and expires <= self._clock():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, None if ex is None else self._clock() + ex)
+
+
+def shared_backend(url):
+    """redis client for a redis:// URL (redis is only needed when one is configured)."""
+    if not url:
+        return None
+    import redis
+    return redis.Redis.from_url(url)
+
+
+class ScoreCache:
+
+    def __init__(self, version, max_entries=10000, ttl=300, shared=None, clock=time.monotonic):
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self._clock = clock
+        self._entries = OrderedDict()
+        self.hits = self.shared_hits = self.misses = 0
+        self._lock = threading.Lock()
+        # a lock held by another thread at fork time would stay locked in the child
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared_key(key, version):
+        return 'score:%s:%s' % (version, key)
+
+    def get(self, row):
+        """Cached probability for the row, or None."""
+        if not self.max_entries:
+            return None
+        key = row_key(row)
+        now = self._clock()
+        with self._lock:
+            version = self.version
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        if self.shared is not None:
+            value = self.shared.get(self._shared_key(key, version))
+            if value is not None:
+                value = float(value)
+                with self._lock:
+                    if version == self.version:
+                        self._store(key, value, now)
+                    self.shared_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, row, probability, version=None):
+        """Store a probability; skipped if the model changed since `version` was read."""
+        if not self.max_entries:
+            return
+        key = row_key(row)
+        probability = float(probability)
+        now = self._clock()
+        # checked and stored under one lock, so an invalidate() cannot land in between
+        with self._lock:
+            if version is None:
+                version = self.version
+            elif version != self.version:
+                return
+            self._store(key, probability, now)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key, version), repr(probability), ex=self.ttl)
+
+    def _store(self, key, value, now):
+        # caller holds self._lock
+        self._entries[key] = (value, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def score(self, row, score_fn, version=None):
+        """score_fn(row) through the cache.
+
+        version: the model score_fn uses; a request still on a model that has been
+        swapped out is scored without the cache.
+        """
+        if version is None:
+            version = self.version
+        elif version != self.version:
+            return float(score_fn(row))
+        probability = self.get(row)
+        if probability is None:
+            probability = float(score_fn(row))
+            self.put(row, probability, version)
+        return probability
+
+    def invalidate(self, version):
+        """Drop every entry; later keys are scoped to the new model version."""
+        with self._lock:
+            self.version = version
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {'version': self.version, 'entries': len(self._entries), 'hits': self.hits,
+                    'shared_hits': self.shared_hits, 'misses': self.misses,
+                    'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0}
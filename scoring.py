@@ -0,0 +1,127 @@
+import csv
+import io
+
+import numpy as np
+
+
+# Column order of X in model_pipeline_ashish_1.py (credit_pipeline_1.csv without Status)
+FEATURES = ['NewCreditCustomer', 'VerificationType', 'LanguageCode', 'Gender', 'Education',
+            'MaritalStatus', 'EmploymentStatus', 'EmploymentDurationCurrentEmployer',
+            'OccupationArea', 'Restructured', 'CreditScoreEsMicroL', 'Age', 'AppliedAmount',
+            'Interest', 'LoanDuration', 'IncomeTotal', 'LiabilitiesTotal',
+            'AmountOfPreviousLoansBeforeLoan']
+
+BOOLEAN_FEATURES = ['NewCreditCustomer', 'Restructured']
+
+_TRUE = {'true', '1', '1.0', 'yes'}
+
+# request bodies for /v1/score/binary
+BINARY_MIMETYPE = 'application/octet-stream'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def _flags(values):
+    return [float(v.strip().lower() in _TRUE) if isinstance(v, str) else float(bool(v))
+            for v in values]
+
+
+def records_to_matrix(records):
+    """Stack a list of application dicts into one C-contiguous float32 matrix.
+
+    Columns are filled one at a time in FEATURES order so numpy does the
+    string/number conversion for the whole column in a single cast.
+    """
+    X = np.empty((len(records), len(FEATURES)), dtype=np.float32)
+    for j, name in enumerate(FEATURES):
+        column = [record[name] for record in records]
+        X[:, j] = _flags(column) if name in BOOLEAN_FEATURES else column
+    return X
+
+
+def rows_to_matrix(rows, transform=records_to_matrix, n_features=len(FEATURES)):
+    """Accept a JSON array of either feature dicts or positional n_features-value lists.
+
+    Dict records go through `transform` (e.g. a fitted pipeline's transform_batch);
+    positional lists are taken as model input as they are, and must each hold
+    exactly n_features values (len(pipe.columns_): 16 for a PCA pipeline).
+    """
+    if not isinstance(rows, list):
+        raise ValueError("expected a JSON array of rows")
+    if rows and isinstance(rows[0], dict):
+        return transform(rows)
+    if not rows:
+        return np.empty((0, n_features), dtype=np.float32)
+    X = np.asarray(rows, dtype=np.float32)
+    if X.ndim != 2 or X.shape[1] != n_features:
+        raise ValueError("expected rows of %d values, got an array of shape %s" % (n_features, X.shape))
+    return _finite(np.ascontiguousarray(X))
+
+
+def csv_records(text):
+    """Parse a CSV export with a header row naming (at least) the FEATURES columns."""
+    if not isinstance(text, str):
+        text = io.TextIOWrapper(text, encoding='utf-8').read()
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def binary_matrix(body, n_features=len(FEATURES)):
+    """A little-endian float32 row-major payload as an (n, n_features) array over the same bytes."""
+    if len(body) % (4 * n_features):
+        raise ValueError("payload of %d bytes is not a whole number of %d-feature float32 rows"
+                         % (len(body), n_features))
+    return np.frombuffer(body, dtype='<f4').reshape(-1, n_features)
+
+
+def arrow_matrix(body, columns=FEATURES):
+    """Rows of an Arrow IPC stream holding the `columns` (pyarrow is only needed here)."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all()
+    X = np.empty((table.num_rows, len(columns)), dtype=np.float32)
+    for j, name in enumerate(columns):
+        X[:, j] = table.column(name).to_numpy()
+    return X
+
+
+def payload_matrix(body, mimetype, columns=FEATURES):
+    """Model input rows of a binary scoring request: raw float32 rows or an Arrow stream.
+
+    NaN is passed through as a missing value; infinities are rejected with ValueError.
+    """
+    if mimetype == ARROW_MIMETYPE:
+        X = arrow_matrix(body, columns)
+    else:
+        X = binary_matrix(body, len(columns))
+    return _finite(X)
+
+
+def _finite(X):
+    # the models cannot score +-inf (sklearn raises), so it is a bad request, not a 500
+    if np.isinf(X).any():
+        raise ValueError("rows hold infinite values")
+    return X
+
+
+def default_probability(model, X, chunk_rows=None):
+    """Probability of the defaulted class (Status == 1) for every row of X.
+
+    chunk_rows bounds the rows per predict_proba call for very large X.
+    """
+    if chunk_rows and len(X) > chunk_rows:
+        return np.concatenate([default_probability(model, X[start:start + chunk_rows])
+                               for start in range(0, len(X), chunk_rows)])
+    proba = model.predict_proba(X)
+    return proba[:, list(model.classes_).index(1)]
+
+
+def batch_result(model, X, valid=None, errors=None, warnings=None, chunk_rows=None):
+    """JSON-ready batch response: None in place of rejected rows, which are listed in errors;
+    scored rows with values outside the training range are listed in warnings."""
+    valid = np.ones(len(X), dtype=bool) if valid is None else valid
+    proba = np.full(len(X), np.nan)
+    if valid.any():
+        proba[valid] = default_probability(model, X[valid], chunk_rows)
+    return {'predictions': [int(p > 0.5) if ok else None for p, ok in zip(proba.tolist(), valid)],
+            'probabilities': [p if ok else None for p, ok in zip(proba.tolist(), valid)],
+            'errors': [{'row': i, 'error': message} for i, message in sorted((errors or {}).items())],
+            'warnings': [{'row': i, 'warning': message} for i, message in sorted((warnings or {}).items())]}
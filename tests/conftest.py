@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# the modules are top-level scripts in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codes  # noqa: E402
+import scoring  # noqa: E402
+from pipeline import ENCODED, CreditPipeline  # noqa: E402
+from registry import ServedModel  # noqa: E402
+
+
+def frame(n=300, seed=0):
+    """Synthetic training frame with decoded labels in the coded columns."""
+    rng = np.random.default_rng(seed)
+    data = {col: rng.uniform(18, 100, size=n).round(2) for col in scoring.FEATURES}
+    for col in ENCODED:
+        table = codes.TABLES.get(col)
+        labels = list(table.labels.values()) + [table.default] if table else ['a', 'b']
+        data[col] = rng.choice(labels, size=n)
+    data['NewCreditCustomer'] = rng.choice([True, False], size=n)
+    data['Restructured'] = rng.choice([True, False], size=n)
+    data['VerificationType'] = rng.integers(0, 5, size=n).astype(float)
+    data['Gender'] = rng.integers(0, 3, size=n).astype(float)
+    return pd.DataFrame(data)
+
+
+def record(df, i=0):
+    return {col: df[col].iloc[i] for col in scoring.FEATURES}
+
+
+class ConstantModel:
+    """Scores every row with the same probability."""
+
+    n_features_in_ = 18
+    classes_ = np.array([0, 1])
+
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, X):
+        return np.tile([1 - self.probability, self.probability], (len(X), 1))
+
+
+def load(path, version):
+    """Registry loader for `artifact`: a ConstantModel with the probability in the file."""
+    with open(path) as f:
+        probability = float(f.read())
+    return ServedModel(version, CreditPipeline(model=ConstantModel(probability)), max_wait=0)
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / 'credit_pipeline'
+    path.write_text('0.25')
+    return path
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import numpy as np
+
+from batching import MicroBatcher
+
+
+def hammer(batcher, n_threads, calls):
+    results = {}
+
+    def client(t):
+        for i in range(calls):
+            row = np.array([t, i], dtype=np.float32)
+            results[t, i] = batcher.score(row)
+
+    threads = [threading.Thread(target=client, args=(t,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def test_concurrent_callers_get_their_own_results():
+    sizes = []
+
+    def score(X):
+        sizes.append(len(X))
+        return X[:, 0] * 1000 + X[:, 1]
+
+    batcher = MicroBatcher(score, max_rows=8, max_wait=0.001)
+    results, _ = hammer(batcher, 8, 200)
+    assert all(value == t * 1000 + i for (t, i), value in results.items())
+    assert len(results) == 1600 and max(sizes) <= 8 and max(sizes) > 1
+
+
+def test_full_batches_do_not_wait():
+    # hold the first batch so the next rows queue up behind it, leaving the batcher
+    # in its loaded (waiting) mode; a full batch must still go without waiting out max_wait
+    started, gate = threading.Event(), threading.Event()
+
+    def score(X):
+        started.set()
+        gate.wait()
+        return X[:, 0]
+
+    batcher = MicroBatcher(score, max_rows=4, max_wait=30)
+    first = batcher.submit(np.zeros(2, dtype=np.float32))
+    assert started.wait(5)
+    queued = [batcher.submit(np.full(2, i, dtype=np.float32)) for i in range(4)]
+    gate.set()
+    assert first.result(timeout=5) == 0
+    assert [f.result(timeout=5) for f in queued] == [0, 1, 2, 3]
+    start = time.perf_counter()
+    full = [batcher.submit(np.full(2, i, dtype=np.float32)) for i in range(4)]
+    assert [f.result(timeout=5) for f in full] == [0, 1, 2, 3]
+    assert time.perf_counter() - start < 5
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    def score(X):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(score, max_rows=4, max_wait=0.001)
+    try:
+        batcher.score(np.zeros(2, dtype=np.float32))
+    except ValueError as e:
+        assert str(e) == "bad batch"
+    else:
+        raise AssertionError("expected the scoring error")
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import forest_engine
+from forest_engine import CompiledForest
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    y = (np.nan_to_num(X[:, 0]) + rng.normal(size=2000) > 0).astype(int)
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+def rows(n, seed=1):
+    X = np.random.default_rng(seed).normal(size=(n, 6))
+    X[::7, 2] = np.nan
+    return X
+
+
+def test_predict_proba_matches_sklearn_bit_for_bit(forest):
+    X = rows(3000)
+    assert np.array_equal(CompiledForest.from_estimator(forest).predict_proba(X), forest.predict_proba(X))
+
+
+@pytest.mark.parametrize('block_rows', [1, 7, 512, 5000])
+def test_blocking_changes_no_bits(forest, block_rows):
+    compiled = CompiledForest.from_estimator(forest)
+    X = rows(1000)
+    assert np.array_equal(compiled.predict_proba(X, block_rows=block_rows), forest.predict_proba(X))
+    assert compiled.apply(X, block_rows=block_rows).shape == (25, 1000)
+
+
+def test_float32_thresholds_split_like_float64():
+    threshold = np.array([0.1, 1 / 3, -2.0, 1e300, -1e300])
+    floor = forest_engine._float32_floor(threshold)
+    assert np.all(floor <= threshold)
+    with np.errstate(over='ignore'):
+        x = np.concatenate([floor, np.nextafter(floor, np.float32(np.inf))]).astype(np.float32)
+    assert np.array_equal(x[:, None] <= floor, x[:, None] <= threshold)
+
+
+def test_saved_forest_is_memory_mapped(forest, tmp_path):
+    path = str(tmp_path / 'rf_engine')
+    CompiledForest.from_estimator(forest).save(path)
+    loaded = forest_engine.load(path)
+    assert isinstance(loaded.threshold, np.memmap)
+    assert np.array_equal(loaded.predict_proba(rows(100)), forest.predict_proba(rows(100)))
+    assert loaded.predict_proba(rows(0)).shape == (0, 2)
+
+
+def test_failed_save_keeps_the_old_file_and_no_temporary(forest, tmp_path):
+    path = str(tmp_path / 'rf_engine')
+    compiled = CompiledForest.from_estimator(forest)
+    compiled.save(path)
+    before = open(path, 'rb').read()
+    compiled.classes_ = lambda: None    # not picklable
+    with pytest.raises(Exception):
+        compiled.save(path)
+    assert open(path, 'rb').read() == before
+    assert [p.name for p in tmp_path.iterdir()] == ['rf_engine']
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import codes
+from conftest import frame, record
+from pipeline import ENCODED, CreditPipeline
+
+
+@pytest.fixture(scope='module')
+def pipe():
+    return CreditPipeline().fit(frame())
+
+
+@pytest.mark.parametrize('col', [col for col in ENCODED if col in codes.TABLES])
+def test_bondora_codes_encode_like_their_labels(pipe, col):
+    base = record(frame())
+    for code, label in codes.TABLES[col].labels.items():
+        by_label = pipe.transform_one(dict(base, **{col: label}))
+        for raw in (code, str(code), float(code)):
+            assert np.array_equal(pipe.transform_one(dict(base, **{col: raw})), by_label), (col, raw)
+
+
+def test_unlisted_code_falls_back_to_table_default(pipe):
+    base = record(frame())
+    other = pipe.transform_one(dict(base, LanguageCode='Other'))
+    assert np.array_equal(pipe.transform_one(dict(base, LanguageCode=7)), other)
+    assert not np.array_equal(pipe.transform_one(dict(base, LanguageCode=1)), other)
+
+
+def test_batch_matches_single_rows(pipe):
+    df = frame(seed=1)
+    df['LanguageCode'] = np.random.default_rng(1).choice(list(codes.LANGUAGE_CODE.labels), size=len(df))
+    X = pipe.transform_batch(df)
+    assert np.array_equal(X, np.stack([pipe.transform_one(record(df, i)) for i in range(len(df))]))
+
+
+@pytest.fixture(scope='module')
+def coded(tmp_path_factory):
+    """Training frame as Bondora_preprocessed.py writes it: Education keeps the numeric
+    codes and only -1/0 are recoded to Not_present, read back from the CSV."""
+    df = frame(seed=2)
+    rng = np.random.default_rng(2)
+    df['Education'] = pd.Series(rng.choice([1.0, 2.0, 3.0, 4.0, 5.0, 'Not_present'], size=len(df)), dtype=object)
+    path = tmp_path_factory.mktemp('coded') / 'Bondora_preprocessed.csv'
+    df.to_csv(path, index=False)
+    return pd.read_csv(path, low_memory=False)
+
+
+def test_coded_training_frame_accepts_codes_and_labels(coded):
+    assert {'4.0', 'Not_present'} <= set(coded['Education'])
+    pipe = CreditPipeline().fit(coded)
+    base = record(coded)
+    trained = pipe.transform_one(dict(base, Education='4.0'))
+    for raw in (4, '4', 4.0, 'Secondary education', 'secondary education'):
+        assert np.array_equal(pipe.transform_one(dict(base, Education=raw)), trained), raw
+    not_present = pipe.transform_one(dict(base, Education='Not_present'))
+    for raw in (-1, 0, 'Not_present'):
+        assert np.array_equal(pipe.transform_one(dict(base, Education=raw)), not_present), raw
+    assert np.array_equal(pipe.transform_batch(coded), np.stack([pipe.transform_one(record(coded, i))
+                                                                 for i in range(len(coded))]))
@@ -0,0 +1,49 @@
+import gc
+import time
+import weakref
+
+import numpy as np
+import pytest
+
+from conftest import load
+from registry import ModelRegistry
+
+
+def released(ref, timeout=2.0):
+    # the replaced model's batching thread exits asynchronously after close()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        gc.collect()
+        if ref() is None:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_replaced_model_is_released(artifact):
+    registry = ModelRegistry(lambda: str(artifact), load, poll_interval=0)
+    served = registry.get()
+    assert served.batcher.score(np.zeros(18, dtype=np.float32)) == pytest.approx(0.25)
+    old = weakref.ref(served.pipe)
+    del served
+    artifact.write_text('0.625')
+    assert registry.refresh()
+    assert released(old)
+
+
+def test_failed_candidate_is_released_and_not_retried(artifact):
+    candidates = []
+
+    def tracked(path, version):
+        served = load(path, version)
+        candidates.append(weakref.ref(served.pipe))
+        return served
+
+    registry = ModelRegistry(lambda: str(artifact), tracked, poll_interval=0)
+    # warm() rejects probabilities outside [0, 1]
+    artifact.write_text('2.5')
+    with pytest.raises(ValueError):
+        registry.refresh()
+    assert not registry.refresh()
+    assert registry.get().pipe.model.probability == 0.25
+    assert released(candidates[-1])
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import codes
+import schema
+from conftest import frame, record
+from pipeline import CreditPipeline
+
+
+@pytest.fixture(scope='module')
+def training():
+    return frame()
+
+
+@pytest.fixture(scope='module')
+def pipe(training):
+    return CreditPipeline().fit(training)
+
+
+def test_valid_records_give_the_transform_rows(pipe, training):
+    records = [record(training, i) for i in range(50)]
+    X, valid, errors, warnings = schema.compile(pipe).validate(records)
+    assert valid.all() and not errors and not warnings
+    assert np.array_equal(X, pipe.transform_batch(records))
+
+
+def test_schema_lists_the_raw_bondora_codes(pipe):
+    language = next(f for f in pipe.schema_.to_dict()['features'] if f['name'] == 'LanguageCode')
+    assert language['codes']['1'] == language['codes']['estonian']
+
+
+def test_raw_codes_validate_like_their_labels(pipe, training):
+    validator = schema.compile(pipe)
+    base = record(training)
+    for code, label in codes.LANGUAGE_CODE.labels.items():
+        by_code, error, _ = validator.validate_one(dict(base, LanguageCode=str(code)))
+        assert error is None
+        assert np.array_equal(by_code, pipe.transform_one(dict(base, LanguageCode=label)))
+
+
+def test_outside_training_range_is_scored_with_a_warning(pipe, training):
+    validator = schema.compile(pipe)
+    base = record(training)
+    high = training['IncomeTotal'].max() + 1
+    row, error, warning = validator.validate_one(dict(base, IncomeTotal=high))
+    assert error is None and 'IncomeTotal' in warning and 'training range' in warning
+    assert np.array_equal(row, pipe.transform_one(dict(base, IncomeTotal=high)))
+
+
+@pytest.mark.parametrize('field, value, reason', [('IncomeTotal', -1, 'outside'), ('Age', 'abc', 'not a number'),
+                                                  ('Age', float('inf'), 'outside'), ('Age', None, 'missing'),
+                                                  ('Education', 'Wizard', 'not an allowed value')])
+def test_invalid_values_are_rejected(pipe, training, field, value, reason):
+    row, error, warning = schema.compile(pipe).validate_one(dict(record(training), **{field: value}))
+    assert row is None and error.startswith(field) and reason in error
+
+
+def test_margin_enforces_the_widened_training_range(pipe, training):
+    low, high = training['IncomeTotal'].min(), training['IncomeTotal'].max()
+    validator = schema.compile(pipe, margin=0.5)
+    base = record(training)
+    assert validator.validate_one(dict(base, IncomeTotal=high + 0.4 * (high - low)))[1] is None
+    assert 'IncomeTotal' in validator.validate_one(dict(base, IncomeTotal=high + 0.6 * (high - low)))[1]
+
+
+def test_batch_rejects_rows_individually(pipe, training):
+    records = [record(training, i) for i in range(3)]
+    records[1] = dict(records[1], Age='abc')
+    X, valid, errors, warnings = schema.compile(pipe).validate(records)
+    assert valid.tolist() == [True, False, True]
+    assert list(errors) == [1]
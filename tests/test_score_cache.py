@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from conftest import load
+from registry import ModelRegistry
+from score_cache import LocalShared, ScoreCache, model_version, row_key
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def row(value):
+    return np.full(18, value, dtype=np.float32)
+
+
+def test_equal_rows_share_a_key():
+    assert row_key(row(3)) == row_key(np.full(18, 3.0))
+    assert row_key(row(0.0)) == row_key(row(-0.0))
+    assert row_key(row(3)) != row_key(row(4))
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = ScoreCache('v1', max_entries=2)
+    calls = []
+    score = lambda r: calls.append(1) or 0.25
+    for value in (1, 1, 2, 3, 1):
+        assert cache.score(row(value), score) == 0.25
+    # 1 was evicted by 3 (the two most recent are kept)
+    assert len(calls) == 4
+    assert cache.stats()['hits'] == 1 and cache.stats()['entries'] == 2
+
+
+def test_entries_expire():
+    clock = Clock()
+    cache = ScoreCache('v1', ttl=10, clock=clock)
+    cache.put(row(1), 0.5)
+    clock.now = 9.9
+    assert cache.get(row(1)) == 0.5
+    clock.now = 10.0
+    assert cache.get(row(1)) is None
+
+
+def test_workers_share_entries_through_the_shared_backend():
+    clock = Clock()
+    shared = LocalShared(clock=clock)
+    first, second = (ScoreCache('v1', ttl=10, shared=shared, clock=clock) for _ in range(2))
+    first.put(row(1), 0.75)
+    assert second.get(row(1)) == 0.75
+    assert second.stats()['shared_hits'] == 1
+    # copied into the local LRU on the way
+    assert second.get(row(1)) == 0.75 and second.stats()['hits'] == 1
+    clock.now = 10.0
+    assert ScoreCache('v1', shared=shared, clock=clock).get(row(1)) is None
+
+
+def test_shared_entries_are_scoped_to_the_model_version():
+    shared = LocalShared()
+    ScoreCache('v1', shared=shared).put(row(1), 0.75)
+    assert ScoreCache('v2', shared=shared).get(row(1)) is None
+
+
+def test_stale_version_is_neither_stored_nor_served():
+    cache = ScoreCache('v2')
+    cache.put(row(1), 0.1, version='v1')
+    assert cache.get(row(1)) is None
+    cache.put(row(1), 0.2, version='v2')
+    assert cache.score(row(1), lambda r: 0.9, version='v1') == 0.9
+    assert cache.score(row(1), lambda r: 0.9, version='v2') == 0.2
+
+
+
+def test_swap_during_put_is_not_served_by_the_new_version():
+    def swapping_clock():
+        # a swap landing while put() is running
+        if cache.version == 'v1':
+            cache.invalidate('v2')
+        return 0.0
+
+    shared = LocalShared(clock=lambda: 0.0)
+    cache = ScoreCache('v1', shared=shared, clock=swapping_clock)
+    cache.put(row(1), 0.75, version='v1')
+    assert cache.get(row(1)) is None
+    assert ScoreCache('v2', shared=shared).get(row(1)) is None
+
+
+def test_swap_invalidates_the_cache(artifact):
+    cache = ScoreCache(model_version(str(artifact)))
+    registry = ModelRegistry(lambda: str(artifact), load, poll_interval=0,
+                             on_swap=lambda served: cache.invalidate(served.version))
+    served = registry.get()
+    assert cache.score(row(1), served.batcher.score, served.version) == pytest.approx(0.25)
+
+    artifact.write_text('0.625')
+    assert registry.refresh()
+    assert cache.version == registry.version != served.version
+    assert cache.stats()['entries'] == 0
+    current = registry.get()
+    assert cache.score(row(1), current.batcher.score, current.version) == pytest.approx(0.625)
+    # a request that started before the swap is scored on its own model, without the cache
+    assert cache.score(row(2), lambda r: 0.25, served.version) == 0.25
+    assert cache.get(row(2)) is None
+    assert not registry.refresh()
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import scoring
+
+
+def test_positional_rows_of_the_model_width():
+    X = scoring.rows_to_matrix([[1.0] * 16, [2.0] * 16], n_features=16)
+    assert X.shape == (2, 16) and X.dtype == np.float32 and X.flags.c_contiguous
+    assert scoring.rows_to_matrix([]).shape == (0, len(scoring.FEATURES))
+
+
+@pytest.mark.parametrize('rows', [[[0.0] * 17] * 18, [[0.0] * 19], [0.0] * 18, [[0.0] * 18, [0.0] * 17]])
+def test_rows_of_the_wrong_width_are_rejected(rows):
+    with pytest.raises(ValueError):
+        scoring.rows_to_matrix(rows)
+
+
+def test_infinite_payload_values_are_rejected():
+    X = np.zeros((3, 16), dtype='<f4')
+    X[1, 4] = np.nan
+    assert np.isnan(scoring.payload_matrix(X.tobytes(), scoring.BINARY_MIMETYPE, list(range(16)))[1, 4])
+    X[2, 7] = -np.inf
+    with pytest.raises(ValueError, match="infinite"):
+        scoring.payload_matrix(X.tobytes(), scoring.BINARY_MIMETYPE, list(range(16)))
+    with pytest.raises(ValueError, match="infinite"):
+        scoring.rows_to_matrix(X.tolist(), n_features=16)
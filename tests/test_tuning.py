@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from tuning import successive_halving
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5))
+    return X, (X[:, 0] + rng.normal(size=600) > 0).astype(int)
+
+
+def test_invalid_configurations_are_dropped(data):
+    result = successive_halving(RandomForestClassifier(random_state=0),
+                                {'max_features': ['auto', 'sqrt'], 'n_estimators': [10]},
+                                *data, min_rows=200, min_trees=5, n_jobs=1)
+    assert result.best_params_['max_features'] == 'sqrt'
+    assert np.isfinite(result.best_score_)
+
+
+def test_all_invalid_grid_raises(data):
+    with pytest.raises(ValueError, match="no configuration"):
+        successive_halving(RandomForestClassifier(), {'max_features': ['auto']}, *data, n_jobs=1)
+
+
+def test_data_errors_are_not_swallowed(data):
+    X, y = data
+    X = X.copy()
+    X[0, 0] = np.inf
+    with pytest.raises(ValueError, match="infinity"):
+        successive_halving(RandomForestClassifier(), {'max_depth': [2, 4]}, X, y, n_jobs=1)
+
+
+def test_rounds_stop_once_the_budget_saturates(data):
+    grid = {'max_depth': list(range(1, 10)), 'n_estimators': [5]}
+    result = successive_halving(RandomForestClassifier(random_state=0), grid, *data,
+                                min_rows=600, min_trees=5, n_jobs=1)
+    assert len(result.history) == 1 and len(result.history[0]) == 9
+    result = successive_halving(RandomForestClassifier(random_state=0), grid, *data,
+                                min_rows=200, min_trees=5, n_jobs=1)
+    assert [len(r) for r in result.history] == [9, 3]
+    assert result.history[-1][0]['rows'] == 600
@@ -0,0 +1,145 @@
+"""Budget-aware random forest tuning.
+
+successive_halving() evaluates every configuration of a parameter grid on a
+small budget (few rows, few trees), keeps the best 1/eta of them and repeats
+with eta times the budget, until the survivors are scored on all rows with
+their full n_estimators. Most configurations are discarded after costing a
+few cheap fits, so the search can run on the whole dataset.
+
+Configurations that differ only in n_estimators are not fitted separately:
+one forest per fold is grown with warm_start through the requested tree
+counts and scored after each increment (warm_start_scores()).
+"""
+import math
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+try:
+    from sklearn.utils._param_validation import InvalidParameterError
+    _INVALID_PARAMS = (InvalidParameterError,)
+except ImportError:
+    # scikit-learn < 1.2 still accepts the values later versions reject (e.g. max_features='auto')
+    _INVALID_PARAMS = ()
+
+
+class HalvingResult:
+
+    def __init__(self, history):
+        self.history = history
+        final = max(history[-1], key=lambda entry: np.nan_to_num(entry['score'], nan=-np.inf))
+        self.best_params_ = final['params']
+        self.best_score_ = final['score']
+
+
+def _without_trees(params):
+    # hashable key of a configuration minus n_estimators
+    return tuple(sorted((name, value) for name, value in params.items() if name != 'n_estimators'))
+
+
+def _warm_scores(estimator, params, n_list, X, y, train, test, scorer):
+    """Grow one forest through the ascending n_list, scoring the held-out fold after each step."""
+    model = clone(estimator).set_params(**params).set_params(warm_start=True)
+    scores = []
+    try:
+        for n in n_list:
+            model.set_params(n_estimators=n).fit(X[train], y[train])
+            scores.append(scorer(model, X[test], y[test]))
+    except _INVALID_PARAMS:
+        # invalid combination for this sklearn version (e.g. max_features='auto'); any other
+        # error (bad data, a failing scorer) is raised
+        scores += [np.nan] * (len(n_list) - len(scores))
+    return scores
+
+
+def warm_start_scores(estimator, params, n_estimators, X, y, cv=3, scoring='accuracy', oob=False,
+                      n_jobs=-1, random_state=0):
+    """Mean score of `params` at every value in n_estimators, from one growing forest per fold.
+
+    The 400-tree forest is the 200-tree forest plus 200 more trees, so the whole
+    n_estimators axis costs about as much as fitting its largest value once. With
+    oob=True (bootstrap forests only) a single forest on all rows is grown and its
+    out-of-bag score is read after each increment instead of cross-validating.
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    n_list = sorted(n_estimators)
+    if oob:
+        model = clone(estimator).set_params(**params).set_params(warm_start=True, oob_score=True,
+                                                                bootstrap=True)
+        scores = []
+        for n in n_list:
+            scores.append(model.set_params(n_estimators=n).fit(X, y).oob_score_)
+        return dict(zip(n_list, scores))
+    scorer = check_scoring(estimator, scoring=scoring)
+    folds = StratifiedKFold(cv, shuffle=True, random_state=random_state).split(X, y)
+    per_fold = Parallel(n_jobs=n_jobs)(delayed(_warm_scores)(estimator, params, n_list, X, y, train, test, scorer)
+                                       for train, test in folds)
+    return dict(zip(n_list, np.mean(per_fold, axis=0).tolist()))
+
+
+def successive_halving(estimator, param_grid, X, y, cv=3, eta=3, min_rows=500, min_trees=20,
+                       scoring='accuracy', n_jobs=-1, random_state=0, verbose=0):
+    """Successive halving over ParameterGrid(param_grid) with rows and trees as the resource.
+
+    Round i trains on min_rows * eta**i rows (a fixed random permutation, so each
+    round's rows contain the previous round's) and caps n_estimators at
+    min_trees * eta**i; the last round uses every row and each survivor's own
+    n_estimators. The number of rounds is also capped at the first round whose rows
+    and trees both reach the full budget. Returns a HalvingResult with best_params_, best_score_ and the
+    per-round history of (params, rows, trees, score).
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    candidates = list(ParameterGrid(param_grid))
+    scorer = check_scoring(estimator, scoring=scoring)
+    order = np.random.RandomState(random_state).permutation(len(y))
+    default_trees = estimator.get_params().get('n_estimators', 100)
+    max_trees = max(params.get('n_estimators', default_trees) for params in candidates)
+    n_rounds = max(1, math.ceil(math.log(len(candidates), eta)) + 1)
+    # like sklearn's n_possible_iterations: once rows and trees both reach the full budget
+    # further rounds would repeat the same fits, so that round is the last one
+    saturated = 0
+    while min_rows * eta ** saturated < len(y) or min_trees * eta ** saturated < max_trees:
+        saturated += 1
+    n_rounds = min(n_rounds, saturated + 1)
+
+    history = []
+    for i in range(n_rounds):
+        last = i == n_rounds - 1 or len(candidates) == 1
+        rows = len(y) if last else min(len(y), min_rows * eta ** i)
+        trees = None if last else min_trees * eta ** i
+        X_round, y_round = X[order[:rows]], y[order[:rows]]
+        folds = list(StratifiedKFold(cv, shuffle=True, random_state=random_state).split(X_round, y_round))
+        budgets = [dict(params, n_estimators=min(params.get('n_estimators', default_trees), trees or np.inf))
+                   for params in candidates]
+        # candidates differing only in n_estimators share one warm-started forest per fold
+        keys = [_without_trees(budget) for budget in budgets]
+        groups = {}
+        for key, budget in zip(keys, budgets):
+            groups.setdefault(key, set()).add(budget['n_estimators'])
+        tasks = [(key, sorted(n_set), fold) for key, n_set in groups.items() for fold in range(cv)]
+        paths = Parallel(n_jobs=n_jobs)(
+            delayed(_warm_scores)(estimator, dict(key), n_list, X_round, y_round, *folds[fold], scorer)
+            for key, n_list, fold in tasks)
+        fold_scores = {}
+        for (key, n_list, fold), path in zip(tasks, paths):
+            for n, score in zip(n_list, path):
+                fold_scores.setdefault((key, n), []).append(score)
+        scores = np.array([np.mean(fold_scores[key, budget['n_estimators']])
+                           for key, budget in zip(keys, budgets)])
+        if np.isnan(scores).all():
+            raise ValueError("no configuration of the grid is valid for this scikit-learn version "
+                             "(every candidate failed in round %d)" % i)
+        history.append([{'params': params, 'rows': rows, 'trees': budget['n_estimators'], 'score': score}
+                        for params, budget, score in zip(candidates, budgets, scores)])
+        if verbose:
+            print("round %d: %d candidates, %d rows, <= %s trees, best %.4f"
+                  % (i, len(candidates), rows, trees or 'all', np.max(np.nan_to_num(scores, nan=-np.inf))))
+        if last:
+            break
+        keep = max(1, math.ceil(len(candidates) / eta))
+        ranked = np.argsort(np.where(np.isnan(scores), -np.inf, scores))[::-1][:keep]
+        candidates = [candidates[j] for j in ranked]
+    return HalvingResult(history)